@@ -25,7 +25,10 @@ It supports two modes of operation:
 Both modes provide:
 - Summary table showing the current SMF state of all modules
 - Interactive menu to inspect detailed structure contents of individual modules
+- Non-interactive --json output of all module states for scripts and CI
 - Full DWARF-based type resolution for accurate memory interpretation
+- Symbol information cached per ELF build ID in ~/.cache/asset-tracker-inspector,
+  so repeated runs against the same build skip DWARF parsing (disable with --no-cache)
 
 Prerequisites:
     pip install "pyelftools>=0.30" pylink-square
@@ -33,11 +36,20 @@ Prerequisites:
     Note: pylink-square is only required for J-Link mode, not for coredump analysis.
 """
 
+import os
 import sys
 import argparse
+import bisect
+import hashlib
+import json
+import mmap
+import pickle
 import logging
 import traceback
 import struct
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union
@@ -75,6 +87,8 @@ class StructMember:
 class StructType(TypeInfo):
     """Represents a structure type."""
     members: List[StructMember] = field(default_factory=list)
+    # Set while the members are not parsed yet, see TypeParser.resolve_struct()
+    die_offset: Optional[int] = None
 
 @dataclass
 class EnumType(TypeInfo):
@@ -112,6 +126,8 @@ class SymbolInfo:
     state_var_addr: Optional[int] = None
     states_array_addr: Optional[int] = None
     state_var_type: Optional[TypeInfo] = None
+    # Size of one entry in the states array, i.e. 'struct smf_state' in this build
+    state_size: Optional[int] = None
     # We still keep the top-level enum map for the main state machine state
     # usually found via the 'state' enum type.
     enum_map: Dict[int, str] = field(default_factory=dict)
@@ -186,22 +202,43 @@ MODULES = [
     ),
 ]
 
-# Size of 'struct smf_state' in bytes.
+# Size of 'struct smf_state' in bytes, used if the states array type is unknown.
 SMF_STATE_SIZE_DEFAULT = 20
 DW_OP_ADDR = 0x03
 
+# Precompiled decoders for the little-endian integer sizes found in state structs.
+_UINT_STRUCTS = {size: struct.Struct(fmt) for size, fmt in ((1, '<B'), (2, '<H'), (4, '<I'), (8, '<Q'))}
+
+# Maximum address span of module state variables read in one transfer for the summary.
+SUMMARY_BATCH_SPAN = 4096
+
+# Resolved symbol information is cached here, keyed by the ELF build ID.
+CACHE_DIR = Path.home() / '.cache' / 'asset-tracker-inspector'
+# Bump when the cached SymbolInfo contents change.
+CACHE_VERSION = 2
+
 
 # --- DWARF Parsing Helpers ---
 
+# Decoded DWARF strings. The same names (types, members, 'states', ...) repeat
+# across DIEs and CUs, so each distinct byte string is decoded only once.
+_decoded_names: Dict[bytes, str] = {}
+
+
 def _decode_name(attribute: Any) -> Optional[str]:
     """Helper to safely decode a DWARF attribute string."""
     if not attribute:
         return None
-    try:
-        return attribute.value.decode('utf-8', errors='ignore')
-    except (AttributeError, UnicodeDecodeError):
+
+    value = attribute.value
+    if not isinstance(value, bytes):
         return None
 
+    name = _decoded_names.get(value)
+    if name is None:
+        name = _decoded_names[value] = value.decode('utf-8', errors='ignore')
+    return name
+
 
 def _extract_address_from_location(die: DIE) -> Optional[int]:
     """Extracts the address from a DW_AT_location attribute."""
@@ -218,6 +255,10 @@ class TypeParser:
     def __init__(self, dwarfinfo):
         self.dwarfinfo = dwarfinfo
         self.cache: Dict[int, TypeInfo] = {}
+        self.die_cache: Dict[int, DIE] = {}
+        # Sorted CU start offsets and matching (end offset, CU), built on first use
+        self.cu_starts: List[int] = []
+        self.cu_ranges: List[tuple] = []
 
     def _get_die_from_attribute(self, attr: Any, cu: Any) -> DIE:
         """Resolves a DIE from a DW_AT_type (or similar) attribute."""
@@ -234,8 +275,12 @@ class TypeParser:
 
         return self._get_die_at_offset(offset)
 
-    def parse_type(self, die: DIE) -> TypeInfo:
-        """Parses a type DIE and returns a TypeInfo object."""
+    def parse_type(self, die: DIE, lazy: bool = False) -> TypeInfo:
+        """Parses a type DIE and returns a TypeInfo object.
+
+        With lazy set, a structure is returned with only its name and size, and
+        its members are parsed later through resolve_struct().
+        """
         # Check cache to avoid infinite recursion on self-referential types
         if die.offset in self.cache:
             return self.cache[die.offset]
@@ -251,12 +296,15 @@ class TypeParser:
 
             if type_attr:
                 target_die = self._get_die_from_attribute(type_attr, die.cu)
-                parsed = self.parse_type(target_die)
+                parsed = self.parse_type(target_die, lazy)
                 return parsed
             else:
                  # void or unknown
                 return PrimitiveType(name="void", size=0)
 
+        if tag == 'DW_TAG_structure_type' and lazy:
+            return StructType(name=name, size=size, die_offset=die.offset)
+
     # Create placeholder in cache for recursive structures
         if tag == 'DW_TAG_structure_type':
             struct_type = StructType(name=name, size=size)
@@ -326,99 +374,361 @@ class TypeParser:
         # Fallback for base types and others
         return PrimitiveType(name=name, size=size)
 
+    def resolve_struct(self, struct_type: StructType) -> StructType:
+        """Parses the members of a structure returned by a lazy parse_type()."""
+        if struct_type.die_offset is not None:
+            parsed = self.parse_type(self._get_die_at_offset(struct_type.die_offset))
+            struct_type.members = parsed.members
+            struct_type.die_offset = None
+        return struct_type
+
     def _get_die_at_offset(self, offset: int) -> DIE:
+        die = self.die_cache.get(offset)
+        if die is not None:
+            return die
+
         try:
             # This is available in pyelftools >= 0.27
-            return self.dwarfinfo.get_DIE_from_refaddr(offset)
+            die = self.dwarfinfo.get_DIE_from_refaddr(offset)
         except AttributeError:
-            # Fallback: scan all CUs (VERY SLOW)
-            for cu in self.dwarfinfo.iter_CUs():
-                for die in cu.iter_DIEs():
-                    if die.offset == offset:
-                        return die
-        raise ValueError(f"DIE at offset {offset} not found")
+            # Fallback: find the owning CU and index all of its DIEs
+            cu = self._get_cu_containing(offset)
+            if cu is not None:
+                for cu_die in cu.iter_DIEs():
+                    self.die_cache[cu_die.offset] = cu_die
+            die = self.die_cache.get(offset)
+
+        if die is None:
+            raise ValueError(f"DIE at offset {offset} not found")
+
+        self.die_cache[offset] = die
+        return die
+
+    def _get_cu_containing(self, offset: int) -> Any:
+        """Finds the CU whose range in .debug_info contains the offset."""
+        if not self.cu_starts:
+            cus = sorted(self.dwarfinfo.iter_CUs(), key=lambda cu: cu.cu_offset)
+            self.cu_starts = [cu.cu_offset for cu in cus]
+            self.cu_ranges = [(cu.cu_offset + cu.size, cu) for cu in cus]
+
+        index = bisect.bisect_right(self.cu_starts, offset) - 1
+        if index >= 0:
+            end, cu = self.cu_ranges[index]
+            if offset < end:
+                return cu
+        return None
+
+
+def build_cu_index(elffile: ELFFile, dwarfinfo: Any) -> Dict[str, int]:
+    """Maps symbol names to the offset of the CU that defines them.
+
+    Uses the .debug_pubnames/.debug_pubtypes name tables when the toolchain
+    emitted them. As those only list external names, function addresses from
+    the ELF symbol table (which includes static functions) are additionally
+    resolved to their CU through .debug_aranges. Names missing from the index
+    make callers fall back to a full scan.
+    """
+    index: Dict[str, int] = {}
+
+    for table in (dwarfinfo.get_pubtypes(), dwarfinfo.get_pubnames()):
+        if table:
+            for name, entry in table.items():
+                index.setdefault(name, entry.cu_ofs)
+
+    aranges = dwarfinfo.get_aranges()
+    symtab = elffile.get_section_by_name('.symtab')
 
+    if aranges is None or not aranges.entries or symtab is None:
+        return index
 
-def get_symbol_info(dwarfinfo: Any, config: ModuleConfig) -> SymbolInfo:
-    """Scans DWARF info to find symbol addresses and type info."""
-    result = SymbolInfo()
+    # Thumb function symbols have bit 0 set, which is not part of the address
+    addr_mask = ~1 if elffile['e_machine'] == 'EM_ARM' else ~0
+
+    for symbol in symtab.iter_symbols():
+        if symbol['st_info']['type'] != 'STT_FUNC' or not symbol.name:
+            continue
+
+        cu_offset = aranges.cu_offset_at_addr(symbol['st_value'] & addr_mask)
+        if cu_offset is not None:
+            index.setdefault(symbol.name, cu_offset)
+
+    return index
+
+
+# DIE tags that can hold a module symbol, everything else is skipped unparsed.
+_SCANNED_TAGS = frozenset(('DW_TAG_subprogram', 'DW_TAG_variable', 'DW_TAG_enumeration_type'))
+
+
+def _get_array_element_size(die: DIE, type_parser: TypeParser) -> Optional[int]:
+    """Returns the element size of an array variable, if its type is an array."""
+    type_attr = die.attributes.get('DW_AT_type')
+    if not type_attr:
+        return None
+
+    array_type = type_parser.parse_type(type_parser._get_die_from_attribute(type_attr, die.cu))
+    if not isinstance(array_type, ArrayType) or not array_type.element_type:
+        return None
+
+    return array_type.element_type.size or None
+
+
+def _scan_compilation_unit(compilation_unit: Any, configs: List[ModuleConfig],
+                           type_parser: TypeParser) -> Dict[str, SymbolInfo]:
+    """Resolves the symbols of all given modules in a single walk over a CU.
+
+    Only modules whose state variable was found are returned.
+    """
+    results = {config.name: SymbolInfo() for config in configs}
+    by_function = {config.function_name: config for config in configs}
+    by_enum = {config.enum_type_name: config for config in configs if config.enum_type_name}
+    by_states: Dict[str, List[ModuleConfig]] = {}
+    for config in configs:
+        by_states.setdefault(config.states_array_name, []).append(config)
+
+    # Symbols still to be found, so the walk can stop as soon as all are resolved
+    needed = {(config.name, 'func') for config in configs}
+    needed |= {(config.name, 'array') for config in configs}
+    needed |= {(config.name, 'enum') for config in by_enum.values()}
+
+    for die in compilation_unit.iter_DIEs():
+        if not needed:
+            break
+
+        tag = die.tag
+        if tag not in _SCANNED_TAGS:
+            continue
+
+        name = _decode_name(die.attributes.get('DW_AT_name'))
+        if name is None:
+            continue
+
+        # 1. Look for the function and its static variable
+        if tag == 'DW_TAG_subprogram':
+            config = by_function.get(name)
+            if config:
+                result = results[config.name]
+                for child in die.iter_children():
+                    if child.tag == 'DW_TAG_variable':
+                        child_attributes = child.attributes
+                        var_name = _decode_name(child_attributes.get('DW_AT_name'))
+                        if var_name == config.variable_name:
+                            addr = _extract_address_from_location(child)
+                            if addr is not None:
+                                result.state_var_addr = addr
+                                # Parse the type of the variable
+                                type_attr = child_attributes.get('DW_AT_type')
+                                if type_attr:
+                                    type_die = type_parser._get_die_from_attribute(type_attr, die.cu)
+                                    # Members are only parsed when the module is inspected
+                                    result.state_var_type = type_parser.parse_type(type_die, lazy=True)
+                                needed.discard((config.name, 'func'))
+
+        # 2. Look for the 'states' array
+        elif tag == 'DW_TAG_variable':
+            states_configs = by_states.get(name)
+            addr = _extract_address_from_location(die) if states_configs else None
+            if addr is not None:
+                state_size = _get_array_element_size(die, type_parser)
+                for config in states_configs:
+                    results[config.name].states_array_addr = addr
+                    results[config.name].state_size = state_size
+                    needed.discard((config.name, 'array'))
+
+        # 3. Look for the main state enum type (for the simple summary)
+        else:
+            config = by_enum.get(name)
+            if config:
+                results[config.name].enum_map = type_parser.parse_type(die).mapping
+                needed.discard((config.name, 'enum'))
+
+    return {name: info for name, info in results.items() if info.state_var_addr is not None}
+
+
+def _scan_indexed_cus_parallel(elf_path: Path, indexed: Dict[int, List[ModuleConfig]],
+                               jobs: int) -> Optional[Dict[str, SymbolInfo]]:
+    """Scans the given CUs in worker processes, each with its own view of the ELF.
+
+    Returns None if the process pool could not be used.
+    """
+    try:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(indexed))) as executor:
+            futures = [
+                executor.submit(_scan_compilation_unit_at, elf_path, cu_offset, configs)
+                for cu_offset, configs in indexed.items()
+            ]
+            lookup: Dict[str, SymbolInfo] = {}
+            for future in futures:
+                lookup.update(future.result())
+            return lookup
+    except (OSError, BrokenProcessPool) as e:
+        logger.debug("Parallel DWARF scan unavailable, scanning sequentially: %s", e)
+        return None
+
+
+def get_symbol_info(dwarfinfo: Any, modules: List[ModuleConfig],
+                    cu_index: Optional[Dict[str, int]] = None,
+                    elf_path: Optional[Path] = None, jobs: int = 1) -> Dict[str, SymbolInfo]:
+    """Scans DWARF info to find symbol addresses and type info of all modules.
+
+    Each CU is walked at most once, resolving every module it defines, and a
+    single TypeParser is shared so common types are parsed only once.
+
+    CUs found through the index are independent of each other. With jobs > 1
+    and the ELF path given, they are scanned in up to that many processes.
+    """
     type_parser = TypeParser(dwarfinfo)
+    lookup: Dict[str, SymbolInfo] = {}
+
+    # Jump straight to the CUs defining the module threads when they are indexed
+    indexed: Dict[int, List[ModuleConfig]] = {}
+    for config in modules:
+        if cu_index and config.function_name in cu_index:
+            indexed.setdefault(cu_index[config.function_name], []).append(config)
+
+    parallel_lookup = None
+    if elf_path is not None and jobs > 1 and len(indexed) > 1:
+        parallel_lookup = _scan_indexed_cus_parallel(elf_path, indexed, jobs)
+
+    if parallel_lookup is not None:
+        lookup.update(parallel_lookup)
+    else:
+        for cu_offset, configs in indexed.items():
+            compilation_unit = dwarfinfo.get_CU_at(cu_offset)
+            lookup.update(_scan_compilation_unit(compilation_unit, configs, type_parser))
+
+    # Everything not resolved through the index shares one scan over all CUs,
+    # selected by the source file name of each CU
+    remaining: Dict[str, List[ModuleConfig]] = {}
+    for config in modules:
+        if config.name not in lookup:
+            remaining.setdefault(config.file_name, []).append(config)
 
     for compilation_unit in dwarfinfo.iter_CUs():
+        if not remaining:
+            break
+
+        # DW_AT_name is enough to get the file name, no need to join DW_AT_comp_dir.
+        # It may use Windows separators when the firmware was built on Windows.
         top_die = compilation_unit.get_top_DIE()
-        die_path = top_die.get_full_path()
+        cu_name = _decode_name(top_die.attributes.get('DW_AT_name')) or ""
+        file_name = cu_name.replace('\\', '/').rpartition('/')[2]
 
-        if not die_path.endswith(config.file_name):
+        configs = remaining.get(file_name)
+        if not configs:
             continue
 
-        for die in compilation_unit.iter_DIEs():
-
-            # 1. Look for the function and its static variable
-            if die.tag == 'DW_TAG_subprogram':
-                func_name = _decode_name(die.attributes.get('DW_AT_name'))
-                if func_name == config.function_name:
-                    for child in die.iter_children():
-                        if child.tag == 'DW_TAG_variable':
-                            var_name = _decode_name(child.attributes.get('DW_AT_name'))
-                            if var_name == config.variable_name:
-                                addr = _extract_address_from_location(child)
-                                if addr is not None:
-                                    result.state_var_addr = addr
-                                    # Parse the type of the variable
-                                    type_attr = child.attributes.get('DW_AT_type')
-                                    if type_attr:
-                                        type_die = type_parser._get_die_from_attribute(type_attr, die.cu)
-                                        result.state_var_type = type_parser.parse_type(type_die)
-
-            # 2. Look for the 'states' array
-            if die.tag == 'DW_TAG_variable':
-                var_name = _decode_name(die.attributes.get('DW_AT_name'))
-                if var_name == config.states_array_name:
-                    addr = _extract_address_from_location(die)
-                    if addr is not None:
-                        result.states_array_addr = addr
-
-            # 3. Look for the main state enum type (for the simple summary)
-            if config.enum_type_name and die.tag == 'DW_TAG_enumeration_type':
-                name = _decode_name(die.attributes.get('DW_AT_name'))
-                if name == config.enum_type_name:
-                    result.enum_map = type_parser.parse_type(die).mapping
-
-        if result.state_var_addr is not None:
-            break
+        lookup.update(_scan_compilation_unit(compilation_unit, configs, type_parser))
+
+        configs = [config for config in configs if config.name not in lookup]
+        if configs:
+            remaining[file_name] = configs
+        else:
+            del remaining[file_name]
+
+    # Keep the module order of the input for display
+    return {config.name: lookup[config.name] for config in modules if config.name in lookup}
+
+
+@contextmanager
+def open_elf(elf_path: Path):
+    """Opens an ELF file as a read-only memory map.
+
+    pyelftools seeks around the file a lot while parsing DWARF, which is
+    cheaper on a mapping backed by the page cache than through buffered I/O.
+    """
+    with open(elf_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def _scan_compilation_unit_at(elf_path: Path, cu_offset: int,
+                              configs: List[ModuleConfig]) -> Dict[str, SymbolInfo]:
+    """Process pool worker: opens the ELF and scans the CU at the given offset."""
+    with open_elf(elf_path) as elf_data:
+        dwarfinfo = ELFFile(elf_data).get_dwarf_info()
+        compilation_unit = dwarfinfo.get_CU_at(cu_offset)
+        return _scan_compilation_unit(compilation_unit, configs, TypeParser(dwarfinfo))
+
 
-    return result
+# --- Symbol Cache ---
 
+def get_build_id(elffile: ELFFile, elf_data: mmap.mmap) -> str:
+    """Returns the GNU build ID of the ELF, or the SHA-256 of the file if it has none."""
+    section = elffile.get_section_by_name('.note.gnu.build-id')
 
-def analyze_elf(elf_path: Path) -> Dict[str, SymbolInfo]:
+    if section is not None:
+        for note in section.iter_notes():
+            if note['n_type'] == 'NT_GNU_BUILD_ID':
+                return note['n_desc']
+
+    return hashlib.sha256(elf_data).hexdigest()
+
+
+def load_cached_lookup(build_id: str) -> Optional[Dict[str, SymbolInfo]]:
+    """Loads previously resolved symbol information for the given build ID."""
+    cache_file = CACHE_DIR / f"{build_id}-v{CACHE_VERSION}.pkl"
+
+    try:
+        with open(cache_file, 'rb') as f:
+            modules, lookup = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e: # pylint: disable=broad-except
+        logger.warning("Ignoring unreadable symbol cache %s: %s", cache_file, e)
+        return None
+
+    # The cache is only valid for the module definitions it was created with
+    if modules != MODULES:
+        return None
+
+    return lookup
+
+
+def store_cached_lookup(build_id: str, lookup: Dict[str, SymbolInfo]):
+    """Stores resolved symbol information for the given build ID."""
+    cache_file = CACHE_DIR / f"{build_id}-v{CACHE_VERSION}.pkl"
+
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((MODULES, lookup), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning("Could not write symbol cache %s: %s", cache_file, e)
+
+
+def analyze_elf(elf_path: Path, use_cache: bool = True, jobs: int = 1) -> Dict[str, SymbolInfo]:
     """Parses the ELF file to extract symbol information."""
     logger.info(f"Parsing ELF: {elf_path}")
-    lookup: Dict[str, SymbolInfo] = {}
-
     try:
-        with open(elf_path, 'rb') as f:
-            elffile = ELFFile(f)
+        with open_elf(elf_path) as elf_data:
+            elffile = ELFFile(elf_data)
+            build_id = get_build_id(elffile, elf_data)
+
+            if use_cache:
+                lookup = load_cached_lookup(build_id)
+                if lookup:
+                    logger.info(f"Using cached symbols for build {build_id}")
+                    return lookup
+
             if not elffile.has_dwarf_info():
                 logger.error("ELF file has no DWARF debug info.")
                 return {}
 
             dwarfinfo = elffile.get_dwarf_info()
+            cu_index = build_cu_index(elffile, dwarfinfo)
 
-            for module in MODULES:
-                # logger.debug(f"Looking up symbols for {module.name}...")
-                info = get_symbol_info(dwarfinfo, module)
-
-                if info.state_var_addr is None:
-                    # Only warn if it looks like we should have found it
-                    pass
-                else:
-                    lookup[module.name] = info
+            lookup = get_symbol_info(dwarfinfo, MODULES, cu_index, elf_path, jobs)
 
     except Exception as e:
         logger.error("Error parsing ELF: %s", e)
         traceback.print_exc()
         return {}
 
+    if use_cache and lookup:
+        store_cached_lookup(build_id, lookup)
+
     return lookup
 
 
@@ -434,21 +744,33 @@ def read_smf_state_name(jlink, info: SymbolInfo, current_state_ptr: int) -> str:
     if offset < 0:
         return f"Unknown (0x{current_state_ptr:X})"
 
-    # Heuristic for index
-    index = -1
-    if offset % SMF_STATE_SIZE_DEFAULT == 0:
-        index = offset // SMF_STATE_SIZE_DEFAULT
-    elif offset % 16 == 0:
-        index = offset // 16
+    # Index into the states array, using the element size from DWARF when known
+    state_size = info.state_size or SMF_STATE_SIZE_DEFAULT
+    index, remainder = divmod(offset, state_size)
 
-    if index >= 0:
+    if remainder == 0:
         return info.enum_map.get(index, f"State {index}")
 
     return f"0x{current_state_ptr:X}"
 
 
-def read_value(jlink, address: int, type_info: TypeInfo, indent: int = 0) -> str:
-    """Reads and formats a value from memory based on its type."""
+def _slice_buffer(buf: bytes, offset: int, size: int) -> bytes:
+    """Returns a slice of a structure buffer, failing if it runs past the end."""
+    if offset < 0 or offset + size > len(buf):
+        raise ValueError(f"offset {offset} (size {size}) outside of {len(buf)} byte buffer")
+    return buf[offset:offset + size]
+
+
+def _read_uint(buf: bytes, offset: int, size: int) -> int:
+    """Decodes a little-endian unsigned integer at the given offset of a buffer."""
+    unpacker = _UINT_STRUCTS.get(size)
+    if unpacker is None:
+        return int.from_bytes(_slice_buffer(buf, offset, size), byteorder='little')
+    return unpacker.unpack_from(buf, offset)[0]
+
+
+def read_value_from_buf(buf: bytes, offset: int, type_info: TypeInfo, indent: int = 0) -> str:
+    """Formats a value at the given offset of a buffer based on its type."""
     # prefix = " " * indent
     # Unused for now, but kept for future recursive printing if needed
     _ = indent
@@ -459,8 +781,7 @@ def read_value(jlink, address: int, type_info: TypeInfo, indent: int = 0) -> str
             if type_info.size == 0:
                 return "void"
 
-            data = jlink.memory_read(address, type_info.size)
-            val = int.from_bytes(data, byteorder='little')
+            val = _read_uint(buf, offset, type_info.size)
 
             # Basic formatting
             if type_info.name == "bool":
@@ -470,14 +791,12 @@ def read_value(jlink, address: int, type_info: TypeInfo, indent: int = 0) -> str
             return f"{val} (0x{val:X})"
 
         if isinstance(type_info, EnumType):
-            data = jlink.memory_read(address, type_info.size or 4)
-            val = int.from_bytes(data, byteorder='little')
+            val = _read_uint(buf, offset, type_info.size or 4)
 
             return f"{type_info.mapping.get(val, str(val))} ({val})"
 
         if isinstance(type_info, PointerType):
-            data = jlink.memory_read(address, 4)
-            val = int.from_bytes(data, byteorder='little')
+            val = _read_uint(buf, offset, 4)
 
             if val == 0:
                 return "NULL"
@@ -493,7 +812,7 @@ def read_value(jlink, address: int, type_info: TypeInfo, indent: int = 0) -> str
 
             if isinstance(type_info.element_type, PrimitiveType) and type_info.element_type.size == 1:
                 # Byte array / string
-                data = jlink.memory_read(address, count)
+                data = _slice_buffer(buf, offset, count)
 
                 try:
                     # Try to decode as string if it looks like one
@@ -518,8 +837,8 @@ def read_value(jlink, address: int, type_info: TypeInfo, indent: int = 0) -> str
     return "?"
 
 
-def print_struct(jlink, address: int, struct_type: StructType, info: SymbolInfo, indent: int = 0):
-    """Recursively prints structure members."""
+def print_struct(buf: bytes, base_offset: int, struct_type: StructType, info: SymbolInfo, indent: int = 0):
+    """Recursively prints structure members from a buffer holding the whole state variable."""
     prefix = " " * indent
 
     # Calculate max name length for alignment at this level
@@ -528,22 +847,21 @@ def print_struct(jlink, address: int, struct_type: StructType, info: SymbolInfo,
     max_name_len = max(len(m.name) for m in struct_type.members)
 
     for member in struct_type.members:
-        member_addr = address + member.offset
+        member_offset = base_offset + member.offset
 
         # Special handling for 'struct smf_ctx' to show the state name
         if member.type_info.name == "smf_ctx":
             # smf_ctx first member is 'current' pointer.
             # We can read it manually or just use our helper if we know it matches.
             try:
-                data = jlink.memory_read(member_addr, 4)
-                current_ptr = int.from_bytes(data, byteorder='little')
-                state_name = read_smf_state_name(jlink, info, current_ptr)
+                current_ptr = _read_uint(buf, member_offset, 4)
+                state_name = read_smf_state_name(None, info, current_ptr)
                 print(f"{prefix}{member.name:<{max_name_len}} : {state_name}")
                 continue
             except Exception: # pylint: disable=broad-except
                 pass
 
-        val_str = read_value(jlink, member_addr, member.type_info)
+        val_str = read_value_from_buf(buf, member_offset, member.type_info)
 
         # Optionally expand nested structs if they are small or interesting?
         # For now, let's keep it flat unless the user drills down, but since this IS the drill down...
@@ -551,41 +869,102 @@ def print_struct(jlink, address: int, struct_type: StructType, info: SymbolInfo,
         if isinstance(member.type_info, StructType) and member.type_info.name != "smf_ctx":
             print(f"{prefix}{member.name:<{max_name_len}} : {val_str}")
             print(f"{prefix}  {{")
-            print_struct(jlink, member_addr, member.type_info, info, indent + 4)
+            print_struct(buf, member_offset, member.type_info, info, indent + 4)
             print(f"{prefix}  }}")
         else:
             print(f"{prefix}{member.name:<{max_name_len}} : {val_str}")
 
 
-def inspect_module_detail(jlink, info: SymbolInfo, module_name: str):
+def resolve_state_type(elf_path: Path, info: SymbolInfo):
+    """Parses the members of a module state structure that was parsed lazily."""
+    state_type = info.state_var_type
+    if not isinstance(state_type, StructType) or state_type.die_offset is None:
+        return
+
+    with open_elf(elf_path) as elf_data:
+        type_parser = TypeParser(ELFFile(elf_data).get_dwarf_info())
+        type_parser.resolve_struct(state_type)
+
+
+def inspect_module_detail(jlink, info: SymbolInfo, module_name: str, elf_path: Path):
     """Reads and displays the full structure of the module state."""
     if not info.state_var_addr or not isinstance(info.state_var_type, StructType):
         print(f"No structure information available for {module_name}.")
         return
 
+    try:
+        resolve_state_type(elf_path, info)
+    except Exception as e: # pylint: disable=broad-except
+        logger.error("Error parsing type of %s: %s", module_name, e)
+        return
+
     print(f"\n--- {module_name} State Details ---")
     print(f"Address: 0x{info.state_var_addr:08X}")
     print(f"Type: {info.state_var_type.name}")
     print("-" * 40)
 
-    print_struct(jlink, info.state_var_addr, info.state_var_type, info)
+    # Fetch the whole state variable in one transfer and decode members from it
+    try:
+        buf = bytes(jlink.memory_read(info.state_var_addr, info.state_var_type.size))
+    except Exception as e: # pylint: disable=broad-except
+        print(f"<Error: {e}>")
+    else:
+        print_struct(buf, 0, info.state_var_type, info)
     print("-" * 40)
 
 
+def read_current_state_ptrs(jlink, lookup: Dict[str, SymbolInfo]) -> Dict[str, Optional[int]]:
+    """Reads the current SMF state pointer (smf_ctx.current) of each module.
+
+    The state variables usually sit close together in .data/.bss, so when they
+    fit within SUMMARY_BATCH_SPAN bytes they are fetched in a single transfer
+    of 32-bit words, which the probe returns already decoded. Otherwise, or if
+    the batched read fails, each pointer is read on its own.
+    Modules whose pointer could not be read map to None.
+    """
+    addrs = {name: info.state_var_addr for name, info in lookup.items()}
+    if not addrs:
+        return {}
+
+    min_addr = min(addrs.values())
+    span = max(addrs.values()) - min_addr + 4
+    word_aligned = all(addr % 4 == 0 for addr in addrs.values())
+
+    if span <= SUMMARY_BATCH_SPAN and word_aligned:
+        try:
+            words = jlink.memory_read32(min_addr, span // 4)
+            return {name: words[(addr - min_addr) // 4] for name, addr in addrs.items()}
+        except Exception: # pylint: disable=broad-except
+            pass
+
+    ptrs: Dict[str, Optional[int]] = {}
+    for name, addr in addrs.items():
+        try:
+            ptrs[name] = jlink.memory_read32(addr, 1)[0]
+        except Exception: # pylint: disable=broad-except
+            ptrs[name] = None
+    return ptrs
+
+
 def print_summary(jlink, lookup):
     """Prints the summary table of all modules."""
     print(f"\n{'Module':<15} | {'Current State':<60} | {'Details'}")
     print("-" * 100)
 
+    lookup = {
+        name: info for name, info in lookup.items()
+        if info.state_var_addr is not None and info.states_array_addr is not None
+    }
+    state_ptrs = read_current_state_ptrs(jlink, lookup)
+
     for name, info in lookup.items():
-        if info.state_var_addr is None or info.states_array_addr is None:
+        current_state_ptr = state_ptrs[name]
+
+        if current_state_ptr is None:
+            print(f"{name:<15} | {'???':<60} | Error reading")
             continue
 
         try:
-            # Read first word (smf_ctx.current)
-            data = jlink.memory_read32(info.state_var_addr, 1)
-            current_state_ptr = data[0]
-
             state_name = read_smf_state_name(jlink, info, current_state_ptr)
 
             print(f"{name:<15} | {state_name:<60} | Ptr: 0x{current_state_ptr:08X}")
@@ -594,10 +973,42 @@ def print_summary(jlink, lookup):
             print(f"{name:<15} | {'???':<60} | Error reading")
 
 
-def interactive_loop(lookup, device_name: str, serial_number: Optional[str]):
-    """Main interactive loop."""
+def get_states(jlink, lookup: Dict[str, SymbolInfo]) -> Dict[str, Dict[str, Optional[str]]]:
+    """Reads the current SMF state of all modules for machine-readable output."""
+    lookup = {
+        name: info for name, info in lookup.items()
+        if info.state_var_addr is not None and info.states_array_addr is not None
+    }
+    state_ptrs = read_current_state_ptrs(jlink, lookup)
+    states: Dict[str, Dict[str, Optional[str]]] = {}
+
+    for name, info in lookup.items():
+        current_state_ptr = state_ptrs[name]
+
+        if current_state_ptr is None:
+            states[name] = {'state': None, 'ptr': None}
+        else:
+            states[name] = {
+                'state': read_smf_state_name(jlink, info, current_state_ptr),
+                'ptr': f"0x{current_state_ptr:08X}",
+            }
+
+    return states
 
-    print(f"Connecting to J-Link ({device_name})...")
+
+def print_states_json(jlink, lookup: Dict[str, SymbolInfo]):
+    """Prints the current SMF state of all modules as JSON."""
+    print(json.dumps(get_states(jlink, lookup), indent=2))
+
+
+def interactive_loop(lookup, elf_path: Path, device_name: str, serial_number: Optional[str],
+                     json_output: bool = False):
+    """Main interactive loop.
+
+    With json_output set, the states are printed once as JSON instead.
+    """
+
+    logger.info(f"Connecting to J-Link ({device_name})...")
 
     jlink = pylink.JLink()
 
@@ -606,6 +1017,10 @@ def interactive_loop(lookup, device_name: str, serial_number: Optional[str]):
         jlink.set_tif(pylink.enums.JLinkInterfaces.SWD)
         jlink.connect(device_name)
 
+        if json_output:
+            print_states_json(jlink, lookup)
+            return
+
         while True:
             print_summary(jlink, lookup)
 
@@ -630,7 +1045,7 @@ def interactive_loop(lookup, device_name: str, serial_number: Optional[str]):
                 idx = int(choice) - 1
 
                 if 0 <= idx < len(modules):
-                    inspect_module_detail(jlink, lookup[modules[idx]], modules[idx])
+                    inspect_module_detail(jlink, lookup[modules[idx]], modules[idx], elf_path)
                     input("\nPress Enter to continue...")
                 else:
                     print("Invalid selection.")
@@ -644,7 +1059,7 @@ def interactive_loop(lookup, device_name: str, serial_number: Optional[str]):
             jlink.close()
 
 
-def interactive_coredump_loop(lookup, mem):
+def interactive_coredump_loop(lookup, mem, elf_path: Path):
     """Interactive loop for coredump-backed inspection (no J-Link)."""
 
     while True:
@@ -667,7 +1082,7 @@ def interactive_coredump_loop(lookup, mem):
             idx = int(choice) - 1
 
             if 0 <= idx < len(modules):
-                inspect_module_detail(mem, lookup[modules[idx]], modules[idx])
+                inspect_module_detail(mem, lookup[modules[idx]], modules[idx], elf_path)
                 input("\nPress Enter to continue...")
             else:
                 print("Invalid selection.")
@@ -700,7 +1115,7 @@ class SegmentMemory:
 
     def memory_read32(self, addr: int, count: int = 1) -> List[int]:
         raw = self._slice(addr, 4 * count)
-        return [int.from_bytes(raw[i * 4:(i + 1) * 4], 'little') for i in range(count)]
+        return list(struct.unpack(f"<{count}I", raw))
 
 
 def load_coredump_segments(coredump_path: Path) -> List[tuple]:
@@ -796,6 +1211,9 @@ Examples:
 
   Offline coredump analysis:
     %(prog)s --elf build/zephyr/zephyr.elf --coredump coredump-12345678.elf
+
+  Read all module states once as JSON (scripting/CI):
+    %(prog)s --elf build/zephyr/zephyr.elf --json
         ''',
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
@@ -810,6 +1228,15 @@ Examples:
     )
     parser.add_argument('--snr',
                         help='J-Link serial number for live debugging. Only used without --coredump.')
+    parser.add_argument('--json', action='store_true',
+                        help='Print the current state of all modules as JSON and exit instead of '
+                             'starting the interactive menu')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of processes used to parse module DWARF info. Each process '
+                             're-parses the DWARF sections, so this only pays off for ELFs with '
+                             'many module CUs (default: 1, single-pass scan)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f'Do not read or write the symbol cache in {CACHE_DIR}')
     args = parser.parse_args()
 
     elf_path = Path(args.elf)
@@ -818,7 +1245,7 @@ Examples:
         logger.error(f"ELF file not found: {elf_path}")
         sys.exit(1)
 
-    lookup = analyze_elf(elf_path)
+    lookup = analyze_elf(elf_path, use_cache=not args.no_cache, jobs=args.jobs)
 
     if not lookup:
         logger.error(
@@ -840,11 +1267,14 @@ Examples:
             sys.exit(1)
 
         mem = SegmentMemory(memory_segments)
-        interactive_coredump_loop(lookup, mem)
+        if args.json:
+            print_states_json(mem, lookup)
+        else:
+            interactive_coredump_loop(lookup, mem, elf_path)
         sys.exit(0)
 
     # Default: live device via J-Link
-    interactive_loop(lookup, args.device, args.snr)
+    interactive_loop(lookup, elf_path, args.device, args.snr, json_output=args.json)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,21 @@
 #!/usr/bin/env python3
 
+import argparse
+import asyncio
+import json
 import os
 import sys
+import tempfile
+import time
 from pathlib import Path
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AzureOpenAI
 
-def setup_client():
+def setup_client(api_version="2024-02-15-preview", client_class=AzureOpenAI):
     """Initialize OpenAI client with Azure OpenAI """
     try:
         # Try Azure OpenAI
-        return AzureOpenAI(
-            api_version="2024-02-15-preview",
+        return client_class(
+            api_version=api_version,
             api_key=os.getenv("OPENAI_API_KEY"),
             azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
         )
@@ -21,15 +26,32 @@ def setup_client():
 # Initialize the client
 client = setup_client()
 
-def read_c_file(file_path):
-    with open(file_path, 'r') as f:
-        return f.read()
+# Separates the diagrams of several files answered in one completion
+FILE_BREAK = "%%%FILE_BREAK%%%"
+
+# Files sent per completion, bounded to stay well within the model context window
+MAX_FILES_PER_REQUEST = 4
+
+# The Batch API needs a newer API version than the one used for online requests
+BATCH_API_VERSION = "2024-10-21"
+BATCH_POLL_INTERVAL_S = 60
+BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
 
-def generate_state_diagram(c_code):
-    # Configure OpenAI API
+# Completions in flight at once when more files are given than fit in one request
+MAX_CONCURRENT_REQUESTS = 8
 
-    # System prompt to guide the analysis
-    system_prompt = """
+MULTI_FILE_INSTRUCTIONS = f"""
+
+    MULTIPLE FILES:
+    1. The input may contain several C files, each starting with a line "### FILE <n>: <path>"
+    2. Analyze each file independently and generate one complete diagram per file
+    3. Output the diagrams in the same order as the files
+    4. Put a line containing only {FILE_BREAK} between consecutive diagrams
+    """
+
+# System prompt to guide the analysis. Kept at module level and sent verbatim as the first
+# message of every request, so the service can reuse the cached prompt prefix across requests.
+SYSTEM_PROMPT = """
     You are a specialized state machine analyzer for Zephyr RTOS SMF framework C code.
     Your task is to generate precise PlantUML state diagrams by following these detailed rules:
 
@@ -338,39 +360,198 @@ state STATE_RUNNING {
 
     """
 
-    # User prompt with the actual code
-    user_prompt = f"Create a PlantUML state diagram from this C code:\n\n{c_code}"
+def read_c_file(file_path):
+    with open(file_path, 'r') as f:
+        return f.read()
 
-    try:
-        response = client.chat.completions.create(model="gpt-5.2",
-        messages=[
-            {"role": "system", "content": system_prompt},
+def build_request(c_files):
+    """Builds the chat completion payload for a list of (path, C code) tuples."""
+    if len(c_files) == 1:
+        # User prompt with the actual code
+        user_prompt = f"Create a PlantUML state diagram from this C code:\n\n{c_files[0][1]}"
+    else:
+        # Share one request, and one copy of the system prompt, between all files. The extra
+        # instructions go in the user prompt to keep the system prompt identical for all requests.
+        user_prompt = MULTI_FILE_INSTRUCTIONS
+        user_prompt += "Create a PlantUML state diagram for each of these C files:\n\n"
+        user_prompt += "".join(
+            f"### FILE {i}: {path}\n{c_code}\n" for i, (path, c_code) in enumerate(c_files, 1)
+        )
+
+    return {
+        "model": "gpt-5.2",
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt}
         ],
-        # temperature=0.2,  # For consistent results
-        # max_completion_tokens=4000,
-        # seed=42,   # For consistent results
-	)
+        # "temperature": 0.2,  # For consistent results
+        # "max_completion_tokens": 4000,
+        # "seed": 42,   # For consistent results
+    }
+
+def generate_state_diagrams(c_files):
+    """Generates PlantUML diagrams for a list of (path, C code) tuples in one completion.
+
+    The completion is streamed and echoed to stdout as it arrives, so progress is visible
+    while the model is still generating. Returns the diagrams in the order of the input files.
+    """
+    try:
+        stream = client.chat.completions.create(**build_request(c_files), stream=True)
+
+        parts = []
+        for chunk in stream:
+            # Azure sends chunks without choices, e.g. for content filter results
+            if not chunk.choices:
+                continue
 
-        # Extract the PlantUML diagram
-        plantuml_diagram = response.choices[0].message.content.strip()
-        return plantuml_diagram
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                print(delta, end="", flush=True)
+        print()
+
+        # Extract the PlantUML diagram(s)
+        diagrams = split_diagrams("".join(parts), c_files)
 
     except Exception as e:
         print(f"Error generating diagram: {e}")
         sys.exit(1)
 
+    if len(diagrams) != len(c_files):
+        # The model did not keep the files apart, request them one by one instead
+        print(f"Expected {len(c_files)} diagrams but got {len(diagrams)}, retrying per file")
+        return [generate_state_diagrams([c_file])[0] for c_file in c_files]
+
+    return diagrams
+
+async def generate_state_diagrams_async(aclient, c_files, semaphore):
+    """Async variant of generate_state_diagrams, without streaming to stdout.
+
+    The semaphore bounds the number of completions in flight across all concurrent calls.
+    """
+    try:
+        async with semaphore:
+            response = await aclient.chat.completions.create(**build_request(c_files))
+
+        diagrams = split_diagrams(response.choices[0].message.content, c_files)
+
+    except Exception as e:
+        print(f"Error generating diagram: {e}")
+        sys.exit(1)
+
+    if len(diagrams) != len(c_files):
+        # The model did not keep the files apart, request them one by one instead
+        print(f"Expected {len(c_files)} diagrams but got {len(diagrams)}, retrying per file")
+        results = await asyncio.gather(
+            *(generate_state_diagrams_async(aclient, [c_file], semaphore) for c_file in c_files)
+        )
+        return [result[0] for result in results]
+
+    return diagrams
+
+async def generate_all_state_diagrams(groups):
+    """Generates the diagrams for several groups of files with concurrent completions.
+
+    Returns a list of diagram lists, in the order of the groups.
+    """
+    async with setup_client(client_class=AsyncAzureOpenAI) as aclient:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        return await asyncio.gather(
+            *(generate_state_diagrams_async(aclient, group, semaphore) for group in groups)
+        )
+
+def split_diagrams(content, c_files):
+    """Splits a completion into one diagram per file, a single file is never split."""
+    if len(c_files) == 1:
+        return [content.strip()]
+    return [diagram.strip() for diagram in content.split(FILE_BREAK)]
+
+def generate_state_diagrams_batch(c_files):
+    """Generates diagrams for a list of (path, C code) tuples through the Batch API.
+
+    Batch jobs are billed at a lower rate and are not subject to the per-minute request
+    limits of online requests, at the cost of latency. Returns a dict mapping each path to
+    its diagram, files whose request failed are missing from it.
+    """
+    batch_client = setup_client(BATCH_API_VERSION)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        for c_file_path, c_code in c_files:
+            f.write(json.dumps({
+                "custom_id": str(c_file_path),
+                "method": "POST",
+                "url": "/chat/completions",
+                "body": build_request([(c_file_path, c_code)]),
+            }) + "\n")
+        requests_file = f.name
+
+    try:
+        with open(requests_file, "rb") as f:
+            input_file = batch_client.files.create(file=f, purpose="batch")
+
+        batch = batch_client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/chat/completions",
+            completion_window="24h"
+        )
+        print(f"Submitted batch {batch.id} with {len(c_files)} requests")
+
+        while batch.status not in BATCH_FINAL_STATES:
+            time.sleep(BATCH_POLL_INTERVAL_S)
+            batch = batch_client.batches.retrieve(batch.id)
+            print(f"Batch {batch.id} status: {batch.status}")
+
+        if batch.status != "completed" or not batch.output_file_id:
+            print(f"Error: Batch {batch.id} ended with status {batch.status}")
+            sys.exit(1)
+
+        output = batch_client.files.content(batch.output_file_id).text
+
+    except Exception as e:
+        print(f"Error generating diagrams in batch: {e}")
+        sys.exit(1)
+    finally:
+        os.unlink(requests_file)
+
+    diagrams = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+
+        result = json.loads(line)
+        response = result.get("response") or {}
+
+        if result.get("error") or response.get("status_code") != 200:
+            print(f"Error generating diagram for {result['custom_id']}: "
+                  f"{result.get('error') or response.get('body')}")
+            continue
+
+        diagrams[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"].strip()
+
+    return diagrams
+
 def save_plantuml_diagram(diagram, output_file):
     with open(output_file, 'w') as f:
         f.write(diagram)
 
+def output_file_for(c_file_path):
+    """Returns the .puml file name for a C file, based on the C file's name."""
+    base_name = os.path.splitext(os.path.basename(c_file_path))[0]
+    return base_name + '.puml'
+
 def main():
-    if len(sys.argv) != 2:
-        print("\nParses Zephyr RTOS SMF state machine C code and generates PlantUML diagram")
-        print("\nOpenAI api backend")
-        print("\nUsage: ./smf_to_plantuml.py <path_to_c_file>")
-        print("Example: ./smf_to_plantuml.py src/modules/network/network_module.c")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Parses Zephyr RTOS SMF state machine C code and generates PlantUML diagrams "
+                    "using the Azure OpenAI API backend. One <name>.puml file is written to the "
+                    "current directory per input file.",
+        epilog="Example: ./smf_to_plantuml.py app/src/modules/network/network.c "
+               "app/src/modules/cloud/cloud.c"
+    )
+    parser.add_argument("c_files", nargs="+", type=Path, help="Path(s) to the C file(s) to parse")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit all files as one job to the Batch API and wait for it to "
+                             "complete. Cheaper for many files, but may take much longer.")
+    args = parser.parse_args()
 
     if 'OPENAI_API_KEY' not in os.environ or 'AZURE_OPENAI_ENDPOINT' not in os.environ:
         print("\nError: Required environment variables not set")
@@ -378,27 +559,45 @@ def main():
         print("         export AZURE_OPENAI_ENDPOINT='your-azure-endpoint'")
         sys.exit(1)
 
-    # Get the input C file path
-    c_file_path = Path(sys.argv[1])
-    if not c_file_path.exists():
-        print(f"Error: File {c_file_path} does not exist")
-        sys.exit(1)
+    for c_file_path in args.c_files:
+        if not c_file_path.exists():
+            print(f"Error: File {c_file_path} does not exist")
+            sys.exit(1)
 
     # Read the C code
-    c_code = read_c_file(c_file_path)
-
-    print(c_code)
-
-    # Generate the plantuml diagram
-    plantuml_diagram = generate_state_diagram(c_code)
-
-    print(plantuml_diagram)
-
-    # Save the diagram using the C file's name
-    base_name = os.path.splitext(os.path.basename(c_file_path))[0]
-    output_file = base_name + '.puml'
-    save_plantuml_diagram(plantuml_diagram, output_file)
-    print(f"State machine diagram saved to {output_file}")
+    c_files = [(c_file_path, read_c_file(c_file_path)) for c_file_path in args.c_files]
+
+    if args.batch:
+        diagrams = generate_state_diagrams_batch(c_files)
+
+        for c_file_path, _ in c_files:
+            plantuml_diagram = diagrams.get(str(c_file_path))
+            if plantuml_diagram is None:
+                continue
+
+            output_file = output_file_for(c_file_path)
+            save_plantuml_diagram(plantuml_diagram, output_file)
+            print(f"State machine diagram saved to {output_file}")
+
+        if len(diagrams) != len(c_files):
+            sys.exit(1)
+        return
+
+    groups = [c_files[start:start + MAX_FILES_PER_REQUEST]
+              for start in range(0, len(c_files), MAX_FILES_PER_REQUEST)]
+
+    # Generate the plantuml diagrams, a single request keeps streaming its output to stdout
+    if len(groups) == 1:
+        results = [generate_state_diagrams(groups[0])]
+    else:
+        results = asyncio.run(generate_all_state_diagrams(groups))
+
+    for group, plantuml_diagrams in zip(groups, results):
+        for (c_file_path, _), plantuml_diagram in zip(group, plantuml_diagrams):
+            # Save the diagram using the C file's name
+            output_file = output_file_for(c_file_path)
+            save_plantuml_diagram(plantuml_diagram, output_file)
+            print(f"State machine diagram saved to {output_file}")
 
 if __name__ == "__main__":
     main()
@@ -1,28 +1,37 @@
+import array
 import json
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import argparse
 import os.path
 
 
-def flatten(node, parent_id=None, result=None):
+def flatten(root):
     """
-    Recursively flattens the nested memory report into a list of records
-    with id, label, parent, and value for sunburst plotting.
+    Flattens the nested memory report into id, label, parent and value columns
+    for sunburst plotting. Walks the tree with an explicit stack, so deep
+    reports do not hit the recursion limit.
     """
-    if result is None:
-        result = []
-    name = node.get('name', '')
-    node_id = f"{parent_id}/{name}" if parent_id else name
-    result.append({
-        'id': node_id,
-        'label': name,
-        'parent': parent_id or "",
-        'value': node.get('size', 0)
-    })
-    for child in node.get('children', []):
-        flatten(child, node_id, result)
-    return result
+    ids, labels, parents = [], [], []
+    values = array.array('q')
+    stack = [(root, "")]
+    while stack:
+        node, parent_id = stack.pop()
+        name = node.get('name', '')
+        node_id = f"{parent_id}/{name}" if parent_id else name
+        ids.append(node_id)
+        labels.append(name)
+        parents.append(parent_id)
+        values.append(node.get('size', 0))
+        # Push in reverse so children are visited in report order
+        stack.extend((child, node_id) for child in reversed(node.get('children', [])))
+    return {
+        'id': ids,
+        'label': labels,
+        'parent': parents,
+        'value': np.frombuffer(values, dtype=np.int64)
+    }
 
 
 def create_sunburst_from_json(json_path, output_html=None):
@@ -31,8 +40,7 @@ def create_sunburst_from_json(json_path, output_html=None):
         report = json.load(f)
 
     root = report['symbols']
-    records = flatten(root)
-    df = pd.DataFrame(records)
+    df = pd.DataFrame(flatten(root))
 
     # Determine if it's RAM or ROM from filename
     memory_type = "RAM" if "ram" in json_path.lower() else "ROM"
@@ -7,12 +7,19 @@
 import subprocess
 import re
 from elftools.elf.elffile import ELFFile
+from elftools.elf.constants import SH_FLAGS
 import tempfile
 import argparse
 import struct
 import os
 from colorama import Fore, Back, Style
 from collections import namedtuple
+from bisect import bisect_left, bisect_right
+
+try:
+	from capstone import Cs, CS_ARCH_ARM, CS_MODE_THUMB
+except ImportError:
+	Cs = None
 
 ETB_DECODER_PATH = os.path.realpath(os.path.dirname(__file__)) + "/decoder"
 OBJDUMP_PATH = "arm-zephyr-eabi-objdump"
@@ -28,7 +35,71 @@ PRINT_ASSEMBLY = True
 PRINT_SYMBOL_INFO_ADDRESS = False
 PRINT_SYMBOL_INFO_REASON = False
 
+# Indentation strings for the usual call depths, deeper (or negative) depths are built on demand
+INDENTS = tuple("\t" * depth for depth in range(64))
+
+def get_indent(depth):
+	if 0 <= depth < len(INDENTS):
+		return INDENTS[depth]
+	return "\t" * depth
+
 def disassemble_elf(file_name):
+	if Cs is None:
+		print("capstone not installed, disassembling with " + OBJDUMP_PATH)
+		return disassemble_elf_objdump(file_name)
+
+	md = Cs(CS_ARCH_ARM, CS_MODE_THUMB)
+	# Step over the odd undecodable halfword inside a code range instead of stopping there
+	md.skipdata = True
+
+	disas_results = {}
+
+	with open(file_name, "rb") as f:
+		elf = ELFFile(f)
+
+		# Function start addresses per section, sorted so instructions can be bisected into them
+		section_symbols = {}
+		# ARM mapping symbols per section: $t starts Thumb code, $d starts data such as literal pools
+		section_mapping = {}
+		for sym in elf.get_section_by_name('.symtab').iter_symbols():
+			if sym['st_info']['type'] not in ('STT_FUNC', 'STT_NOTYPE') or not sym.name:
+				continue
+			if not isinstance(sym['st_shndx'], int):
+				continue
+			if sym.name.startswith('$'):
+				section_mapping.setdefault(sym['st_shndx'], {})[sym['st_value']] = sym.name[1]
+				continue
+			# Clear the Thumb bit
+			section_symbols.setdefault(sym['st_shndx'], {}).setdefault(sym['st_value'] & ~1, sym.name)
+
+		for index, section in enumerate(elf.iter_sections()):
+			if not section['sh_flags'] & SH_FLAGS.SHF_EXECINSTR or section['sh_type'] != 'SHT_PROGBITS':
+				continue
+
+			symbols = sorted(section_symbols.get(index, {}).items())
+			sym_addrs = [address for address, _ in symbols]
+			sym_names = [name for _, name in symbols]
+
+			data = section.data()
+			section_start = section['sh_addr']
+			section_end = section_start + len(data)
+
+			# Disassemble only the Thumb ranges, each from its own start like objdump does, so
+			# data is not decoded as instructions and code after it is not misaligned. A section
+			# without mapping symbols is taken to be all code.
+			mapping = sorted(section_mapping.get(index, {section_start: 't'}).items())
+			for (start, kind), (end, _) in zip(mapping, mapping[1:] + [(section_end, None)]):
+				if kind != 't':
+					continue
+				code = data[start - section_start:end - section_start]
+				for address, _, mnemonic, op_str in md.disasm_lite(code, start):
+					i = bisect_right(sym_addrs, address) - 1
+					symbol = sym_names[i] if i >= 0 else ""
+					disas_results[address] = (f"0x{address:x}:\t{mnemonic}\t{op_str}", symbol)
+
+	return disas_results
+
+def disassemble_elf_objdump(file_name):
 	# Regex to pick out the symbol name and address from the disassembly
 	symbol_regex = r"([0-9a-fA-F]+) <(\S+)>:"
 	instruction_regex = r"([0-9a-fA-F]+):.*"
@@ -67,31 +138,38 @@ ExceptionReturnLine = namedtuple('ExceptionReturnLine', ['idx', 'trc_id'])
 ChangeSymbolLine = namedtuple('ChangeSymbol', ['symbol', 'address', 'reason'])
 RecursionLine = namedtuple('Recursion', ['symbol', 'address', 'count'])
 
-def parse_decoder_output(decoded_trace):
-
-	# Group 1: Index, Group 2: Trace ID, Group 3: First instruction, Group 4: Last instruction, Group 5: Number of instructions, Group 6: Last instruction size, Group 7: ISA, Group 8: Branch taken or not, Group 9: Branch type, Group 10: Detected branch purpose
-	regex_instruction = r"^Idx:(\d+); TrcID:(0x[a-fA-F0-9]+); OCSD_GEN_TRC_ELEM_INSTR_RANGE\(exec range=(0x[a-fA-F0-9]+):\[(0x[a-fA-F0-9]+)\] num_i\((\d+)\) last_sz\((\d)\)\s*\(ISA=(.*?)\)\s*(\w*)\s*(\w*)\s*(.*)\)"
-	# Group 1: Index, Group 2: Trace ID, Group 3: Return address, Group 4: Exception number
-	regex_exception = r"^Idx:(\d+); TrcID:(0x[a-fA-F0-9]+); OCSD_GEN_TRC_ELEM_EXCEPTION\(pref ret addr:(0x[a-fA-F0-9]+).*; excep num \((0x[a-fA-F0-9]+)\) \)"
-	# Regex to detect exception return in the trace
-	regex_exception_return = r"^Idx:(\d+); TrcID:(0x[a-fA-F0-9]+); OCSD_GEN_TRC_ELEM_EXCEPTION_RET\(\)"
-
-	linetypes = [
-		(regex_instruction, InstrRangeLine),
-		(regex_exception, ExceptionLine),
-		(regex_exception_return, ExceptionReturnLine),
-	]
+# One regex for all trace line types, the groups that matched tell the line type apart.
+# Instruction range: first and last instruction, number of instructions, last instruction size, ISA,
+# branch taken or not, branch type, detected branch purpose
+# Exception: return address, exception number
+# Exception return: no groups
+TRACE_LINE_REGEX = re.compile(
+	r"Idx:(?P<idx>\d+); TrcID:(?P<trc_id>0x[a-fA-F0-9]+); (?:"
+	r"OCSD_GEN_TRC_ELEM_INSTR_RANGE\(exec range=(?P<addr_start>0x[a-fA-F0-9]+):\[(?P<addr_end>0x[a-fA-F0-9]+)\] num_i\((?P<num_i>\d+)\) last_sz\((?P<last_sz>\d)\)\s*\(ISA=(?P<isa>.*?)\)\s*(?P<last_instr_executed>\w*)\s*(?P<last_instr_type>\w*)\s*(?P<last_instr_subtype>.*)\)"
+	r"|OCSD_GEN_TRC_ELEM_EXCEPTION\(pref ret addr:(?P<ret_addr>0x[a-fA-F0-9]+).*; excep num \((?P<ex_num>0x[a-fA-F0-9]+)\) \)"
+	r"|OCSD_GEN_TRC_ELEM_EXCEPTION_RET\(\))"
+)
 
-	parse_result = []
-
-	for line in decoded_trace.split("\n"):
-		for pattern, container in linetypes:
-			m = re.search(pattern, line)
-			if m:
-				parse_result.append(container._make(m.groups()))
-				break
+def parse_decoder_output(decoded_trace):
+	# Generator, decoded_trace may be any iterable of lines, e.g. the decoder's stdout
+	for line in decoded_trace:
+		# match() anchors at the start of the line, so no '^' is needed in the pattern
+		m = TRACE_LINE_REGEX.match(line)
+		if m is None:
+			continue
 
-	return parse_result
+		if m['addr_start'] is not None:
+			# Addresses are converted once here, they are only used as integers further on
+			yield InstrRangeLine(
+				m['idx'], m['trc_id'],
+				int(m['addr_start'], 16), int(m['addr_end'], 16),
+				m['num_i'], m['last_sz'], m['isa'],
+				m['last_instr_executed'], m['last_instr_type'], m['last_instr_subtype']
+			)
+		elif m['ret_addr'] is not None:
+			yield ExceptionLine._make(m.group(*ExceptionLine._fields))
+		else:
+			yield ExceptionReturnLine(m['idx'], m['trc_id'])
 
 def group_by_symbol(parse_result, assembly):
 	result = []
@@ -101,7 +179,7 @@ def group_by_symbol(parse_result, assembly):
 
 	for line in parse_result:
 		if type(line) is InstrRangeLine:
-			addr_start = int(line.addr_start, base=16)
+			addr_start = line.addr_start
 
 			_, symbol = assembly.get(addr_start, (None,f"UNKNOWN SYMBOL @ {hex(addr_start)}"))
 			if current_symbol != symbol:
@@ -150,28 +228,29 @@ def get_initial_indentation(parse_result):
 	return abs(min_indentation)
 
 def match_trace_to_assembly(parse_result, assembly):
-	output = ""
+	parts = []
 
 	indentation = 0
-	indent_string = "\t" * indentation
+	indent_string = get_indent(indentation)
 	in_exception = False
 	exception_indent = 0
 
+	# Instruction addresses in order, with the assembly lines at the same indices, so the
+	# instructions of an executed range can be sliced out instead of probing every address
+	assembly_addrs = sorted(assembly)
+	assembly_lines = [assembly[address][0] for address in assembly_addrs]
+
 	if not PRINT_ASSEMBLY:
 		indentation = get_initial_indentation(parse_result)
 
 	for line in parse_result:
 		if type(line) is InstrRangeLine and PRINT_ASSEMBLY:
-			addr_start = int(line.addr_start, base=16)
-			addr_end = int(line.addr_end, base=16)
-
-			# Iterating as if all intructions were 2 bytes (16 Bit), invalid addresses are skipped
-			for address in range(addr_start, addr_end, 2):
-				if address not in assembly:
-					continue
+			prefix = indent_string + "\t"
 
-				asm_line, _ = assembly[address]
-				output = output + f"{indent_string}\t{asm_line}\n"
+			first = bisect_left(assembly_addrs, line.addr_start)
+			last = bisect_left(assembly_addrs, line.addr_end, first)
+			for asm_line in assembly_lines[first:last]:
+				parts.append(f"{prefix}{asm_line}\n")
 		elif type(line) is ChangeSymbolLine or type(line) is RecursionLine:
 			symbol_info = ""
 
@@ -181,55 +260,62 @@ def match_trace_to_assembly(parse_result, assembly):
 				reason = "call"
 
 			if PRINT_SYMBOL_INFO_ADDRESS:
-				symbol_info = f"({line.address})"
+				symbol_info = f"({hex(line.address)})"
 
 			if PRINT_SYMBOL_INFO_REASON:
 				symbol_info = f"{symbol_info} ({reason})"
 
 			if PRINT_ASSEMBLY:
-				output = output + f"\n{line.symbol} {symbol_info}\n"
+				parts.append(f"\n{line.symbol} {symbol_info}\n")
 				continue
 
 			if reason == "return":
 				if in_exception:
 					exception_indent -= 1
-					indent_string = "\t" * exception_indent
+					indent_string = get_indent(exception_indent)
 				else:
 					indentation -= 1
-					indent_string = "\t" * indentation
+					indent_string = get_indent(indentation)
 			elif reason == "call":
 				if in_exception:
 					exception_indent += 1
-					indent_string = "\t" * exception_indent
+					indent_string = get_indent(exception_indent)
 				else:
 					indentation += 1
-					indent_string = "\t" * indentation
+					indent_string = get_indent(indentation)
 
 			if type(line) is RecursionLine:
-				output = output + f"{indent_string}{line.symbol} {symbol_info} {FORMAT_RECURSION}(recursed {line.count} times){FORMAT_RESET}\n"
+				parts.append(f"{indent_string}{line.symbol} {symbol_info} {FORMAT_RECURSION}(recursed {line.count} times){FORMAT_RESET}\n")
 			else:
-				output = output + f"{indent_string}{line.symbol} {symbol_info}\n"
+				parts.append(f"{indent_string}{line.symbol} {symbol_info}\n")
 
 		elif type(line) is ExceptionLine:
 			in_exception = True
-			indent_string = "\t" * exception_indent
-			output = output + f"\n{FORMAT_EXC_START}Exception occurred: {CORTEX_M_EXCEPTIONS.get(int(line.ex_num, 16), int(line.ex_num, 16))} ({line.ex_num}), return address: {line.ret_addr} {FORMAT_RESET}\n"
+			indent_string = get_indent(exception_indent)
+			parts.append(f"\n{FORMAT_EXC_START}Exception occurred: {CORTEX_M_EXCEPTIONS.get(int(line.ex_num, 16), int(line.ex_num, 16))} ({line.ex_num}), return address: {line.ret_addr} {FORMAT_RESET}\n")
 		elif type(line) is ExceptionReturnLine:
 			in_exception = False
-			indent_string = "\t" * indentation
-			output = output + f"{FORMAT_EXC_END}Exception return{FORMAT_RESET}\n\n"
+			indent_string = get_indent(indentation)
+			parts.append(f"{FORMAT_EXC_END}Exception return{FORMAT_RESET}\n\n")
 
-	return output
+	return "".join(parts)
 
 
-def read_data_from_elf(elf: ELFFile, start, size):
-	for segment in elf.iter_segments():
-		start_addr = segment.header['p_vaddr']
-		end_addr = start_addr + segment.header['p_filesz']
-		if start in range(start_addr, end_addr):
-			start_off = start - start_addr
-			result = segment.data()[start_off:start_off + size]
-			return result
+SegmentIndex = namedtuple('SegmentIndex', ['starts', 'segments'])
+
+def build_segment_index(elf: ELFFile):
+	# Segments with file data sorted by start address, so addresses can be bisected into them
+	segments = sorted((s for s in elf.iter_segments() if s.header['p_filesz']), key=lambda s: s.header['p_vaddr'])
+	return SegmentIndex([s.header['p_vaddr'] for s in segments], segments)
+
+def read_data_from_elf(seg_index: SegmentIndex, start, size):
+	# Coredump segments may overlap, e.g. a thread stack inside a dumped RAM region, so walk back
+	# from the last segment starting at or below the address until one contains it
+	for i in range(bisect_right(seg_index.starts, start) - 1, -1, -1):
+		segment = seg_index.segments[i]
+		start_off = start - segment.header['p_vaddr']
+		if start_off < segment.header['p_filesz']:
+			return segment.data()[start_off:start_off + size]
 
 def extract_etb_buf(symbols: ELFFile, coredump: str, tempdir: str):
 	symtab = symbols.get_section_by_name('.symtab')
@@ -243,7 +329,7 @@ def extract_etb_buf(symbols: ELFFile, coredump: str, tempdir: str):
 	etb_buf_valid_address = symtab.get_symbol_by_name("etb_buf_valid")[0].entry['st_value']
 
 	with open(coredump, "rb") as f:
-		coredump = ELFFile(f)
+		coredump = build_segment_index(ELFFile(f))
 		etb_buf_valid = read_data_from_elf(coredump, etb_buf_valid_address, 4)
 		if etb_buf_valid != bytes([0xef, 0xbe, 0xad, 0xde]):
 			print(f"etb_buf_valid has unexpected value: {etb_buf_valid}")
@@ -257,12 +343,15 @@ def extract_etb_buf(symbols: ELFFile, coredump: str, tempdir: str):
 
 
 def decode_trace(trace_file, elf_file, extract_etb):
+	# Generator yielding the decoder output line by line while the decoder is still running,
+	# so the whole decoded trace never has to be held in memory
 	with open(elf_file, "rb") as f:
 		elf = ELFFile(f)
 		start_addr = elf.get_section_by_name('rom_start').header.sh_addr
+		symtab = elf.get_section_by_name('.symtab')
 		etm_trctraceidr = 0x10
 		try:
-			etm_trctraceidr = find_symbol_init_value(elf_file, "etm_trctraceidr")
+			etm_trctraceidr = find_symbol_init_value(elf, symtab, "etm_trctraceidr")
 		except TypeError:
 			pass
 
@@ -272,7 +361,7 @@ def decode_trace(trace_file, elf_file, extract_etb):
 		# TOOD: Figure out why this happens only when reading out the memory from .elf and not when using objdump
 		etm_trcconfigr = 8
 		try:
-			etm_trcconfigr = find_symbol_init_value(elf_file, "etm_trcconfigr") & 0xFFF
+			etm_trcconfigr = find_symbol_init_value(elf, symtab, "etm_trcconfigr") & 0xFFF
 		except TypeError:
 			pass
 
@@ -283,48 +372,47 @@ def decode_trace(trace_file, elf_file, extract_etb):
 
 			tmp_file = os.path.join(tmp, os.path.basename(elf_file))
 			subprocess.run([OBJCOPY_PATH, "-O", "binary", elf_file, tmp_file])
-			decoded_trace = subprocess.run([ETB_DECODER_PATH, "-i", trace_file, "-m", tmp_file, "-decode", "-a", str(start_addr), "-id", str(etm_trctraceidr), "-config", str(etm_trcconfigr)], stdout=subprocess.PIPE)
+			with subprocess.Popen([ETB_DECODER_PATH, "-i", trace_file, "-m", tmp_file, "-decode", "-a", str(start_addr), "-id", str(etm_trctraceidr), "-config", str(etm_trcconfigr)], stdout=subprocess.PIPE, encoding="utf-8") as decoder:
+				yield from decoder.stdout
+
+def find_symbol_init_value(elf: ELFFile, symtab, symbol_name):
+	# Reads from the already opened ELF file, symtab is its '.symtab' section
+	if not symtab:
+		print('No symbol table available!')
+		exit(1)
 
-	return decoded_trace.stdout.decode("utf-8")
+	sym = symtab.get_symbol_by_name(symbol_name)[0]
+	if not sym:
+		print('Symbol {} not found')
+		exit(1)
 
-def find_symbol_init_value(elf_file, symbol_name):
-	with open(elf_file, "rb") as f:
-		elf = ELFFile(f)
-		# Get the symbol table entry for the respective symbol
-		symtab = elf.get_section_by_name('.symtab')
-		if not symtab:
-			print('No symbol table available!')
-			exit(1)
-
-		sym = symtab.get_symbol_by_name(symbol_name)[0]
-		if not sym:
-			print('Symbol {} not found')
-			exit(1)
-
-		# Find the segment where the symbol is loaded to, as the symbol table points to
-		# the loaded address, not the offset in the file
-		file_offset = None
-		for seg in elf.iter_segments():
-			if seg.header['p_type'] != 'PT_LOAD':
-				continue
-			# If the symbol is inside the range of a LOADed segment, calculate the file
-			# offset by subtracting the virtual start address and adding the file offset
-			# of the loaded section(s)
-			if sym['st_value'] >= seg['p_vaddr'] and sym['st_value'] < seg['p_vaddr'] + seg['p_filesz']:
-				file_offset = sym['st_value'] - seg['p_vaddr'] + seg['p_offset']
-				break
-
-		if not file_offset:
-			print('Error getting file offset from ELF data')
-			exit(1)
-
-		# Forward the file stream to the identified offset
-		elf.stream.seek(file_offset)
-		# Read the value as a 4 byte integer and print it
-		value = struct.unpack('i', elf.stream.read(4))[0]
-		print('Variable {} at address {} (file offset {}) has value {}'.format(symbol_name, hex(sym['st_value']), hex(file_offset), hex(value)))
-
-		return value
+	# Find the segment where the symbol is loaded to, as the symbol table points to
+	# the loaded address, not the offset in the file
+	file_offset = None
+	for seg in elf.iter_segments():
+		if seg.header['p_type'] != 'PT_LOAD':
+			continue
+		# If the symbol is inside the range of a LOADed segment, calculate the file
+		# offset by subtracting the virtual start address and adding the file offset
+		# of the loaded section(s)
+		if sym['st_value'] >= seg['p_vaddr'] and sym['st_value'] < seg['p_vaddr'] + seg['p_filesz']:
+			file_offset = sym['st_value'] - seg['p_vaddr'] + seg['p_offset']
+			break
+
+	if not file_offset:
+		print('Error getting file offset from ELF data')
+		exit(1)
+
+	# Forward the file stream to the identified offset, and restore it afterwards as the
+	# stream is shared with the rest of the ELF parsing
+	saved_pos = elf.stream.tell()
+	elf.stream.seek(file_offset)
+	# Read the value as a 4 byte integer and print it
+	value = struct.unpack('i', elf.stream.read(4))[0]
+	elf.stream.seek(saved_pos)
+	print('Variable {} at address {} (file offset {}) has value {}'.format(symbol_name, hex(sym['st_value']), hex(file_offset), hex(value)))
+
+	return value
 
 def main():
 	parser = argparse.ArgumentParser()
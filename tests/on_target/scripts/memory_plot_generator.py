@@ -1,89 +1,108 @@
 #!/usr/bin/env python3
 
-import pandas as pd
-import plotly.express as px
+import csv
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 import sys
 
-def append_to_memory_csv(filename, used, total, current_date, output_dir):
-    """Append memory data to a CSV file."""
-    data = {'Date': current_date, 'Used (B)': used, 'Total (B)': total, 'Usage (%)': (used/total)*100}
-    df = pd.DataFrame([data])
+def read_memory_history(f):
+    """Read a memory history CSV into date, used and total columns."""
+    dates, used, total = [], [], []
+    for row in csv.DictReader(f):
+        dates.append(datetime.fromisoformat(row['Date']))
+        used.append(int(row['Used (B)']))
+        total.append(int(row['Total (B)']))
+    return dates, used, total
 
+def append_to_memory_csv(filename, used, total, current_date, output_dir):
+    """Append memory data to a CSV file and return the full history, see read_memory_history."""
     csv_path = os.path.join(output_dir, filename)
-
-    if os.path.exists(csv_path):
-        print(f"CSV exists at {csv_path}, appending data")
-        # Read existing data
-        existing_df = pd.read_csv(csv_path)
-        print(f"Existing data:\n{existing_df}")
-
-        # Combine existing and new data
-        combined_df = pd.concat([existing_df, df], ignore_index=True)
-        print(f"Combined data:\n{combined_df}")
-
-        # Write back the complete dataset
-        combined_df.to_csv(csv_path, index=False)
-    else:
-        print(f"Creating new CSV at {csv_path}")
-        df.to_csv(csv_path, index=False)
+    write_header = not os.path.exists(csv_path)
+
+    # Append the new row only, instead of reading and rewriting the whole history. The
+    # history is then read back through the same handle for the plots.
+    with open(csv_path, 'a+', newline='') as f:
+        # A last row without a newline would get the new row glued onto it, end it first
+        if f.buffer.seek(0, os.SEEK_END) > 0:
+            f.buffer.seek(-1, os.SEEK_END)
+            if f.buffer.read(1) != b'\n':
+                f.write('\n')
+        writer = csv.writer(f, lineterminator='\n')
+        if write_header:
+            writer.writerow(['Date', 'Used (B)', 'Total (B)', 'Usage (%)'])
+        writer.writerow([current_date, used, total, (used/total)*100])
+        print(f"Appended row to {csv_path}")
+
+        f.seek(0)
+        return read_memory_history(f)
 
 def append_to_csv(ram_used, ram_total, flash_used, flash_total, output_dir):
-    """Append memory usage data to CSV files with timestamps."""
-    current_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    """Append memory usage data to CSV files with timestamps.
+
+    Returns the RAM and Flash histories, to be passed on to generate_memory_plots.
+    """
+    # Same format as '%Y-%m-%d %H:%M:%S', read back with datetime.fromisoformat
+    current_date = datetime.now().isoformat(sep=' ', timespec='seconds')
 
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
     # Append to RAM and Flash CSVs
-    append_to_memory_csv("ram_history.csv", ram_used, ram_total, current_date, output_dir)
-    append_to_memory_csv("flash_history.csv", flash_used, flash_total, current_date, output_dir)
+    ram_history = append_to_memory_csv("ram_history.csv", ram_used, ram_total, current_date, output_dir)
+    flash_history = append_to_memory_csv("flash_history.csv", flash_used, flash_total, current_date, output_dir)
+    return ram_history, flash_history
+
+def _build_and_write(go, history, csv_path, html_path, title):
+    """Write the history plot to html_path, reading the history from csv_path if not given."""
+    if history is None:
+        if not os.path.exists(csv_path):
+            return
+        with open(csv_path, newline='') as f:
+            history = read_memory_history(f)
+    dates, used, total = history
+
+    # WebGL traces keep the page responsive as the history grows
+    fig = go.Figure([
+        go.Scattergl(x=dates, y=used, name='Used (B)',
+                     mode='lines+markers', marker=dict(size=8)),
+        go.Scattergl(x=dates, y=total, name='Total (B)',
+                     mode='lines+markers'),
+    ])
+    fig.update_layout(title=title,
+                      xaxis_title='Date', yaxis_title='Bytes', legend_title_text='Metric')
+    # Set y-axis range, from 0 to a 10% margin above max total
+    fig.update_layout(yaxis=dict(range=[0, max(total) * 1.1]))
+    fig.write_html(html_path)
+
+def generate_memory_plots(output_dir, ram_history=None, flash_history=None):
+    """Generate HTML plots from the CSV data.
+
+    Histories already in memory can be passed in, the CSV files are only read for the others.
+    """
+    # Imported here, plotly is slow to import and only needed for the plots. Imported before
+    # the workers start, so they don't both run plotly's lazy first import at the same time.
+    import plotly.graph_objects as go
 
-def generate_memory_plots(output_dir):
-    """Generate HTML plots from the CSV data."""
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
-    # RAM Plot
-    ram_csv = os.path.join(output_dir, "ram_history.csv")
-    if os.path.exists(ram_csv):
-        df_ram = pd.read_csv(ram_csv)
-        df_ram['Date'] = pd.to_datetime(df_ram['Date'])
-
-        # Calculate y-axis range for RAM
-        y_min_ram = 0  # Start from 0
-        y_max_ram = df_ram['Total (B)'].max() * 1.1  # 10% margin above max total
-
-        fig_ram = px.line(df_ram, x='Date', y=['Used (B)', 'Total (B)'],
-                           title='RAM Usage History - Asset Tracker Template',
-                           labels={'value': 'Bytes', 'variable': 'Metric'})
-        # Update traces: line only for Total, line+markers for Used
-        fig_ram.update_traces(mode='lines+markers', selector=dict(name='Total (B)'))
-        fig_ram.update_traces(mode='lines+markers', selector=dict(name='Used (B)'), marker=dict(size=8))
-        # Set y-axis range
-        fig_ram.update_layout(yaxis=dict(range=[y_min_ram, y_max_ram]))
-        fig_ram.write_html(os.path.join(output_dir, "ram_history_plot.html"))
-
-    # Flash Plot
-    flash_csv = os.path.join(output_dir, "flash_history.csv")
-    if os.path.exists(flash_csv):
-        df_flash = pd.read_csv(flash_csv)
-        df_flash['Date'] = pd.to_datetime(df_flash['Date'])
-
-        # Calculate y-axis range for Flash
-        y_min_flash = 0  # Start from 0
-        y_max_flash = df_flash['Total (B)'].max() * 1.1  # 10% margin above max total
-
-        fig_flash = px.line(df_flash, x='Date', y=['Used (B)', 'Total (B)'],
-                             title='Flash Usage History - Asset Tracker Template',
-                             labels={'value': 'Bytes', 'variable': 'Metric'})
-        # Update traces: line only for Total, line+markers for Used
-        fig_flash.update_traces(mode='lines+markers', selector=dict(name='Total (B)'))
-        fig_flash.update_traces(mode='lines+markers', selector=dict(name='Used (B)'), marker=dict(size=8))
-        # Set y-axis range
-        fig_flash.update_layout(yaxis=dict(range=[y_min_flash, y_max_flash]))
-        fig_flash.write_html(os.path.join(output_dir, "flash_history_plot.html"))
+    # The RAM and Flash plots are independent, serializing and writing them out is largely
+    # I/O, so they are generated in parallel
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(_build_and_write, go, ram_history,
+                            os.path.join(output_dir, "ram_history.csv"),
+                            os.path.join(output_dir, "ram_history_plot.html"),
+                            'RAM Usage History - Asset Tracker Template'),
+            executor.submit(_build_and_write, go, flash_history,
+                            os.path.join(output_dir, "flash_history.csv"),
+                            os.path.join(output_dir, "flash_history_plot.html"),
+                            'Flash Usage History - Asset Tracker Template'),
+        ]
+        # Raise any exception from the workers
+        for future in futures:
+            future.result()
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
@@ -1,10 +1,28 @@
 #!/usr/bin/env python3
 
+import mmap
 import re
 import sys
 import json
 import os
-from memory_plot_generator import append_to_csv, generate_memory_plots
+
+MEMORY_TABLE_ANCHOR = b'Memory region'
+APP_BUILD_LINE_PREFIX = b'Generating files from '
+APP_BUILD_LINE_SUFFIX = b'/app/build/app/zephyr/zephyr.elf for board: thingy91x'
+# Enough to hold the table and the build line that follows it
+MEMORY_TABLE_MAX_SIZE = 2048
+
+# Fallback for tables not laid out as parse_memory_table() expects. Memory stats that are
+# followed by the app build path, compiled once at import. The IDT_LIST row and the build path
+# are each matched within their own line. Bytes pattern, as it is run directly on the memory
+# mapped log.
+MEMORY_STATS_REGEX = re.compile(
+    rb'Memory region\s+Used Size\s+Region Size\s+%age Used\s+'
+    rb'FLASH:\s+(\d+)\s+B\s+(\d+)\s+KB\s+(\d+\.\d+)%\s+'
+    rb'RAM:\s+(\d+)\s+B\s+(\d+)\s+B\s+(\d+\.\d+)%\s+'
+    rb'IDT_LIST:[^\n]*\s+'
+    rb'Generating files from [^\n]*?/app/build/app/zephyr/zephyr\.elf for board: thingy91x'
+)
 
 def format_size(size_in_bytes):
     """Format size in bytes to a human-readable string with appropriate unit."""
@@ -15,8 +33,56 @@ def format_size(size_in_bytes):
     else:
         return f"{size_in_bytes} B"
 
+def parse_memory_table(table):
+    """Parse a memory usage table followed by the app build line, given as bytes.
+
+    Returns the FLASH used, total (KB) and percentage and the RAM used, total and percentage
+    as bytes, or None if this is not the app table or it is not laid out as expected.
+    """
+    lines = table.split(b'\n', 5)
+    if len(lines) < 5:
+        return None
+    flash = lines[1].split()
+    ram = lines[2].split()
+    idt_list = lines[3].split()
+    build_line = lines[4].strip()
+
+    if len(flash) != 6 or flash[0] != b'FLASH:' or flash[2] != b'B' or flash[4] != b'KB':
+        return None
+    if len(ram) != 6 or ram[0] != b'RAM:' or ram[2] != b'B' or ram[4] != b'B':
+        return None
+    if not idt_list or idt_list[0] != b'IDT_LIST:':
+        return None
+    if not build_line.startswith(APP_BUILD_LINE_PREFIX) or APP_BUILD_LINE_SUFFIX not in build_line:
+        return None
+
+    stats = [flash[1], flash[3], flash[5], ram[1], ram[3], ram[5]]
+    if not all(x.isdigit() for x in stats[0:2] + stats[3:5]):
+        return None
+    if not all(x.endswith(b'%') for x in (stats[2], stats[5])):
+        return None
+    stats[2] = stats[2][:-1]
+    stats[5] = stats[5][:-1]
+    return stats
+
+def find_memory_stats(content):
+    """Find the app memory stats in the build log content, see parse_memory_table."""
+    # Memory region tables are printed for every image, go through them until the app one
+    pos = content.find(MEMORY_TABLE_ANCHOR)
+    while pos != -1:
+        # Slicing copies the bytes out, so the result stays valid after a map is closed
+        stats = parse_memory_table(content[pos:pos + MEMORY_TABLE_MAX_SIZE])
+        if stats is None:
+            match = MEMORY_STATS_REGEX.match(content, pos)
+            if match:
+                stats = [bytes(group) for group in match.groups()]
+        if stats is not None:
+            return stats
+        pos = content.find(MEMORY_TABLE_ANCHOR, pos + len(MEMORY_TABLE_ANCHOR))
+    return None
+
 def create_badge_json(label, used, total, percent, output_file):
-    """Create a badge JSON file with the given parameters."""
+    """Create a badge JSON file with the given parameters, unless it already has this content."""
     badge_data = {
         "schemaVersion": 1,
         "label": label,
@@ -24,32 +90,41 @@ def create_badge_json(label, used, total, percent, output_file):
         "color": "blue"
     }
 
-    with open(output_file, 'w') as f:
-        json.dump(badge_data, f, indent=4)
+    new_content = json.dumps(badge_data, indent=4)
+    try:
+        with open(output_file) as f:
+            old_content = f.read()
+    except FileNotFoundError:
+        old_content = None
+
+    # Leave an unchanged badge untouched, and replace a changed one atomically so readers never
+    # see a partially written file
+    if new_content != old_content:
+        tmp_file = output_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            f.write(new_content)
+        os.replace(tmp_file, output_file)
 
 def parse_memory_stats(log_file, output_dir=None):
-    with open(log_file, 'r') as f:
-        content = f.read()
-
-    # Find memory stats that are followed by the app build path
-    pattern = r'Memory region\s+Used Size\s+Region Size\s+%age Used\s+' \
-             r'FLASH:\s+(\d+)\s+B\s+(\d+)\s+KB\s+(\d+\.\d+)%\s+' \
-             r'RAM:\s+(\d+)\s+B\s+(\d+)\s+B\s+(\d+\.\d+)%\s+' \
-             r'IDT_LIST:.*?\s+' \
-             r'Generating files from .*?/app/build/app/zephyr/zephyr\.elf for board: thingy91x'
-
-    match = re.search(pattern, content)
-    if not match:
+    # Search the log through a memory map instead of reading it into a string, build logs
+    # can be large. An empty log cannot be mapped and has no stats either.
+    stats = None
+    if os.path.getsize(log_file) > 0:
+        with open(log_file, 'rb') as f, \
+             mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            stats = find_memory_stats(content)
+
+    if not stats:
         print("Error: Could not find memory stats in log file")
         sys.exit(1)
 
-    flash_used = int(match.group(1))
-    flash_total = int(match.group(2)) * 1024  # Convert KB to B
-    flash_percent = float(match.group(3))
+    flash_used = int(stats[0])
+    flash_total = int(stats[1]) * 1024  # Convert KB to B
+    flash_percent = float(stats[2])
 
-    ram_used = int(match.group(4))
-    ram_total = int(match.group(5))
-    ram_percent = float(match.group(6))
+    ram_used = int(stats[3])
+    ram_total = int(stats[4])
+    ram_percent = float(stats[5])
 
     # Create badge JSON files
     if output_dir is None:
@@ -63,9 +138,11 @@ def parse_memory_stats(log_file, output_dir=None):
     print("Memory Usage Statistics:")
     print(f"FLASH: {flash_used:,} B / {flash_total:,} B ({flash_percent:.2f}%)")
     print(f"RAM:   {ram_used:,} B / {ram_total:,} B ({ram_percent:.2f}%)")
-    # Append data to CSV files and generate plots
-    append_to_csv(ram_used, ram_total, flash_used, flash_total, output_dir)
-    generate_memory_plots(output_dir)
+    # Append data to CSV files and generate plots. Imported here, so that failing to find
+    # the stats does not pay for loading the plotting modules.
+    from memory_plot_generator import append_to_csv, generate_memory_plots
+    ram_history, flash_history = append_to_csv(ram_used, ram_total, flash_used, flash_total, output_dir)
+    generate_memory_plots(output_dir, ram_history, flash_history)
 
     print(f"\nBadge files created:")
     print(f"RAM Badge: {ram_badge_file}")
@@ -3,11 +3,12 @@
 # SPDX-License-Identifier: LicenseRef-Nordic-5-Clause
 ##########################################################################################
 
+import functools
 import os
-import re
 import pytest
+import string
 import types
-from utils.flash_tools import recover_device
+from utils.flash_tools import flash_device, recover_device, reset_device
 from utils.uart import Uart, UartBinary
 import sys
 sys.path.append(os.getcwd())
@@ -24,7 +25,43 @@ DEVICE_UUID = os.getenv('UUID')
 NRFCLOUD_API_KEY = os.getenv('NRFCLOUD_API_KEY')
 DUT_DEVICE_TYPE = os.getenv('DUT_DEVICE_TYPE')
 
+# Firmware artifacts, named ARTIFACT_PREFIX + version + suffix. The version part varies
+# between builds.
+ARTIFACTS_DIR = "artifacts"
+ARTIFACT_PREFIX = "asset-tracker-template-"
+ARTIFACT_VERSION_CHARS = string.digits + string.ascii_lowercase + "."
+HEX_FILE_SUFFIX = f"-{DUT_DEVICE_TYPE}-nrf91.hex"
+DEBUG_HEX_FILE_SUFFIX = f"-debug-{DUT_DEVICE_TYPE}-nrf91.hex"
+BIN_FILE_SUFFIX = f"-{DUT_DEVICE_TYPE}-nrf91-update-signed.hex"
+PATCHED_HEX_FILE_SUFFIX = f"-patched-{DUT_DEVICE_TYPE}-nrf91.hex"
+MQTT_HEX_FILE_SUFFIX = f"-mqtt-{DUT_DEVICE_TYPE}-nrf91.hex"
+EXT_GNSS_HEX_FILE_SUFFIX = f"-ext-gnss-{DUT_DEVICE_TYPE}-nrf91.hex"
+BUFFER_RAM_HEX_FILE_SUFFIX = f"-buffer-ram-{DUT_DEVICE_TYPE}-nrf91.hex"
+BUFFER_FLASH_HEX_FILE_SUFFIX = f"-buffer-flash-{DUT_DEVICE_TYPE}-nrf91.hex"
+
+@functools.lru_cache(maxsize=1)
+def list_artifacts():
+    # The artifacts folder does not change during a session, scan it only once
+    with os.scandir(ARTIFACTS_DIR) as it:
+        return tuple(it)
+
+def is_artifact(name, suffix):
+    if len(name) <= len(ARTIFACT_PREFIX) + len(suffix):
+        return False
+    if not (name.startswith(ARTIFACT_PREFIX) and name.endswith(suffix)):
+        return False
+    # The version has no dashes, so it cannot take in a variant such as "-debug"
+    version = name[len(ARTIFACT_PREFIX):-len(suffix)]
+    return not version.strip(ARTIFACT_VERSION_CHARS)
+
+def find_artifact(suffix):
+    # Absolute, so the session-scoped artifact fixtures hand out paths that can be flashed as is
+    return next((os.path.abspath(entry.path) for entry in list_artifacts() if is_artifact(entry.name, suffix)), None)
+
+@functools.lru_cache(maxsize=1)
 def get_uarts():
+    # The serial devices are only scanned once per session, call get_uarts.cache_clear()
+    # to rescan, e.g. after power cycling the DUT.
     # Handle platform-specific serial device paths
     import platform
 
@@ -34,23 +71,24 @@ def get_uarts():
         base_path = "/dev/serial/by-id"
 
     try:
-        if platform.system() == "Darwin":
-            serial_paths = [os.path.join(base_path, entry) for entry in os.listdir(base_path)
-                          if entry.startswith("tty.")]
-            logger.info(f"Found serial devices: {serial_paths}")
-        else:
-            serial_paths = [os.path.join(base_path, entry) for entry in os.listdir(base_path)]
+        with os.scandir(base_path) as it:
+            if platform.system() == "Darwin":
+                serial_paths = [entry.path for entry in it if entry.name.startswith("tty.")]
+                logger.info(f"Found serial devices: {serial_paths}")
+            else:
+                serial_paths = [entry.path for entry in it]
     except (FileNotFoundError, PermissionError) as e:
         raise RuntimeError("Failed to list serial devices") from e
     if not UART_ID:
         raise RuntimeError("UART_ID not set")
-    uarts = [x for x in sorted(serial_paths) if UART_ID in x]
+    uarts = tuple(x for x in sorted(serial_paths) if UART_ID in x)
     logger.info(f"Found UARTs: {uarts}")
     return uarts
 
 def scan_log_for_assertions(log):
-    assert_counts = log.count("ASSERT")
-    if assert_counts > 0:
+    # Stop at the first occurrence, only count them when failing
+    if "ASSERT" in log:
+        assert_counts = log.count("ASSERT")
         pytest.fail(f"{assert_counts} ASSERT found in log: {log}")
 
 @pytest.hookimpl(tryfirst=True)
@@ -75,6 +113,8 @@ def _purge_pending_fota_jobs():
 def dut_board():
     all_uarts = get_uarts()
     if not all_uarts:
+        # Don't keep the empty result for the following tests
+        get_uarts.cache_clear()
         pytest.fail("No UARTs found")
     log_uart_string = all_uarts[0]
     uart = Uart(log_uart_string, timeout=UART_TIMEOUT)
@@ -87,7 +127,8 @@ def dut_board():
 
     yield types.SimpleNamespace(
         uart=uart,
-        device_type=DUT_DEVICE_TYPE
+        device_type=DUT_DEVICE_TYPE,
+        all_uarts=all_uarts
     )
 
     uart_log = uart.whole_log
@@ -122,6 +163,17 @@ def dut_cloud(dut_board):
         device_id=device_id,
     )
 
+@pytest.fixture(scope="function")
+def connected_dut(dut_cloud, hex_file):
+    """dut_cloud flashed with hex_file, factory reset and connected to cloud."""
+    flash_device(hex_file)
+    dut_cloud.uart.xfactoryreset()
+    dut_cloud.uart.flush()
+    reset_device()
+    dut_cloud.uart.wait_for_str_with_retries("Connected to Cloud", max_retries=3, timeout=240, reset_func=reset_device)
+
+    yield dut_cloud
+
 @pytest.fixture(scope="function")
 def dut_fota(dut_board):
     if not NRFCLOUD_API_KEY:
@@ -146,8 +198,7 @@ def dut_fota(dut_board):
 
 @pytest.fixture(scope="module")
 def dut_traces(dut_board):
-    all_uarts = get_uarts()
-    trace_uart_string = all_uarts[1]
+    trace_uart_string = dut_board.all_uarts[1]
     uart_trace = UartBinary(trace_uart_string)
 
     yield types.SimpleNamespace(
@@ -160,14 +211,10 @@ def dut_traces(dut_board):
 @pytest.fixture(scope="session")
 def hex_file():
     # Search for the firmware hex file in the artifacts folder
-    artifacts_dir = "artifacts/"
-    hex_pattern = f"asset-tracker-template-{r"[0-9a-z\.]+"}-{DUT_DEVICE_TYPE}-nrf91.hex"
-
-    for file in os.listdir(artifacts_dir):
-        if re.match(hex_pattern, file):
-            return os.path.join(artifacts_dir, file)
-
-    pytest.fail("No matching firmware .hex file found in the artifacts directory")
+    path = find_artifact(HEX_FILE_SUFFIX)
+    if not path:
+        pytest.fail("No matching firmware .hex file found in the artifacts directory")
+    return path
 
 @pytest.fixture(scope="session")
 def debug_hex_file():
@@ -176,26 +223,18 @@ def debug_hex_file():
         pytest.skip("Debug build is only available for thingy91x")
 
     # Search for the debug firmware hex file in the artifacts folder
-    artifacts_dir = "artifacts/"
-    hex_pattern = f"asset-tracker-template-{r'[0-9a-z\.]+'}-debug-{DUT_DEVICE_TYPE}-nrf91.hex"
-
-    for file in os.listdir(artifacts_dir):
-        if re.match(hex_pattern, file):
-            return os.path.join(artifacts_dir, file)
-
-    pytest.fail("No matching debug firmware .hex file found in the artifacts directory")
+    path = find_artifact(DEBUG_HEX_FILE_SUFFIX)
+    if not path:
+        pytest.fail("No matching debug firmware .hex file found in the artifacts directory")
+    return path
 
 @pytest.fixture(scope="session")
 def bin_file():
     # Search for the firmware bin file in the artifacts folder
-    artifacts_dir = "artifacts"
-    hex_pattern = f"asset-tracker-template-{r"[0-9a-z\.]+"}-{DUT_DEVICE_TYPE}-nrf91-update-signed.hex"
-
-    for file in os.listdir(artifacts_dir):
-        if re.match(hex_pattern, file):
-            return os.path.join(artifacts_dir, file)
-
-    pytest.fail("No matching firmware .bin file found in the artifacts directory")
+    path = find_artifact(BIN_FILE_SUFFIX)
+    if not path:
+        pytest.fail("No matching firmware .bin file found in the artifacts directory")
+    return path
 
 @pytest.fixture(scope="session")
 def hex_file_patched():
@@ -204,14 +243,10 @@ def hex_file_patched():
         pytest.skip("Patched build is only available for thingy91x")
 
     # Search for the firmware hex file in the artifacts folder
-    artifacts_dir = "artifacts/"
-    hex_pattern = f"asset-tracker-template-{r"[0-9a-z\.]+"}-patched-{DUT_DEVICE_TYPE}-nrf91.hex"
-
-    for file in os.listdir(artifacts_dir):
-        if re.match(hex_pattern, file):
-            return os.path.join(artifacts_dir, file)
-
-    pytest.fail("No matching firmware .hex file found in the artifacts directory")
+    path = find_artifact(PATCHED_HEX_FILE_SUFFIX)
+    if not path:
+        pytest.fail("No matching firmware .hex file found in the artifacts directory")
+    return path
 
 @pytest.fixture(scope="session")
 def hex_file_mqtt():
@@ -220,14 +255,10 @@ def hex_file_mqtt():
         pytest.skip("mqtt build is only available for thingy91x")
 
     # Search for the firmware hex file in the artifacts folder
-    artifacts_dir = "artifacts/"
-    hex_pattern = f"asset-tracker-template-{r"[0-9a-z\.]+"}-mqtt-{DUT_DEVICE_TYPE}-nrf91.hex"
-
-    for file in os.listdir(artifacts_dir):
-        if re.match(hex_pattern, file):
-            return os.path.join(artifacts_dir, file)
-
-    pytest.fail("No matching firmware .hex file found in the artifacts directory")
+    path = find_artifact(MQTT_HEX_FILE_SUFFIX)
+    if not path:
+        pytest.fail("No matching firmware .hex file found in the artifacts directory")
+    return path
 
 @pytest.fixture(scope="session")
 def hex_file_ext_gnss():
@@ -236,14 +267,10 @@ def hex_file_ext_gnss():
         pytest.skip("External GNSS build is only available for nrf9151dk")
 
     # Search for the firmware hex file in the artifacts folder
-    artifacts_dir = "artifacts/"
-    hex_pattern = f"asset-tracker-template-{r'[0-9a-z\.]+'}-ext-gnss-{DUT_DEVICE_TYPE}-nrf91.hex"
-
-    for file in os.listdir(artifacts_dir):
-        if re.match(hex_pattern, file):
-            return os.path.join(artifacts_dir, file)
-
-    pytest.fail("No matching external GNSS firmware .hex file found in the artifacts directory")
+    path = find_artifact(EXT_GNSS_HEX_FILE_SUFFIX)
+    if not path:
+        pytest.fail("No matching external GNSS firmware .hex file found in the artifacts directory")
+    return path
 
 @pytest.fixture(scope="session")
 def hex_file_buffer_ram():
@@ -252,14 +279,10 @@ def hex_file_buffer_ram():
         pytest.skip("Buffer RAM build is only available for thingy91x")
 
     # Search for the firmware hex file in the artifacts folder
-    artifacts_dir = "artifacts/"
-    hex_pattern = f"asset-tracker-template-{r'[0-9a-z\.]+'}-buffer-ram-{DUT_DEVICE_TYPE}-nrf91.hex"
-
-    for file in os.listdir(artifacts_dir):
-        if re.match(hex_pattern, file):
-            return os.path.join(artifacts_dir, file)
-
-    pytest.fail("No matching buffer RAM firmware .hex file found in the artifacts directory")
+    path = find_artifact(BUFFER_RAM_HEX_FILE_SUFFIX)
+    if not path:
+        pytest.fail("No matching buffer RAM firmware .hex file found in the artifacts directory")
+    return path
 
 @pytest.fixture(scope="session")
 def hex_file_buffer_flash():
@@ -268,11 +291,7 @@ def hex_file_buffer_flash():
         pytest.skip("Buffer flash build is only available for thingy91x")
 
     # Search for the firmware hex file in the artifacts folder
-    artifacts_dir = "artifacts/"
-    hex_pattern = f"asset-tracker-template-{r'[0-9a-z\.]+'}-buffer-flash-{DUT_DEVICE_TYPE}-nrf91.hex"
-
-    for file in os.listdir(artifacts_dir):
-        if re.match(hex_pattern, file):
-            return os.path.join(artifacts_dir, file)
-
-    pytest.fail("No matching buffer flash firmware .hex file found in the artifacts directory")
+    path = find_artifact(BUFFER_FLASH_HEX_FILE_SUFFIX)
+    if not path:
+        pytest.fail("No matching buffer flash firmware .hex file found in the artifacts directory")
+    return path
@@ -3,11 +3,14 @@
 # SPDX-License-Identifier: LicenseRef-Nordic-5-Clause
 ##########################################################################################
 
+import functools
 import os
+import re
 import sys
 import pytest
 from time import sleep
 from utils.flash_tools import flash_device, reset_device
+from utils.uart import MsgSet
 
 sys.path.append(os.getcwd())
 from utils.logger import get_logger
@@ -19,14 +22,37 @@ DEFAULT_STORAGE_THRESHOLD = 1
 FLASH_BUFFER_TEST_SAMPLE_INTERVAL = 15
 FLASH_BUFFER_TEST_STORAGE_THRESHOLD = 10
 
+@functools.lru_cache(maxsize=None)
 def get_storing_str(datatype, file_index=0):
-    return "Storing data in file /att_storage/" + datatype + "_" + str(file_index) + ".bin"
+    return f"Storing data in file /att_storage/{datatype}_{file_index}.bin"
 
+@functools.lru_cache(maxsize=None)
 def get_init_header_str(datatype):
-    return "Initialized header file /att_storage/" + datatype + ".header"
+    return f"Initialized header file /att_storage/{datatype}.header"
 
+@functools.lru_cache(maxsize=None)
 def get_open_header_str(datatype):
-    return "Opened header file /att_storage/" + datatype + ".header"
+    return f"Opened header file /att_storage/{datatype}.header"
+
+STORING_MSGS = MsgSet([
+    get_storing_str("LOCATION"),
+    get_storing_str("BATTERY"),
+    get_storing_str("ENVIRONMENTAL")
+])
+
+INIT_HEADER_MSGS = MsgSet([
+    get_init_header_str("LOCATION"),
+    get_init_header_str("BATTERY"),
+    get_init_header_str("ENVIRONMENTAL")
+])
+
+OPEN_HEADER_MSGS = MsgSet([
+    get_open_header_str("LOCATION"),
+    get_open_header_str("BATTERY"),
+    get_open_header_str("ENVIRONMENTAL")
+])
+
+OFFSETS_RE = re.compile(r"Storing data in file /att_storage/ENVIRONMENTAL.*write_offset=(\d+), read_offset=(\d+)")
 
 @pytest.mark.slow
 def test_buffer_flash(dut_cloud, hex_file_buffer_flash):
@@ -42,29 +68,11 @@ def test_buffer_flash(dut_cloud, hex_file_buffer_flash):
         storage_threshold=FLASH_BUFFER_TEST_STORAGE_THRESHOLD
     )
 
-    flash_device(os.path.abspath(hex_file_buffer_flash))
+    flash_device(hex_file_buffer_flash)
     dut_cloud.uart.xfactoryreset()
 
     clear_str = "att_storage clear\r\n"
 
-    storing_list = [
-        get_storing_str("LOCATION"),
-        get_storing_str("BATTERY"),
-        get_storing_str("ENVIRONMENTAL")
-    ]
-
-    init_header_list = [
-        get_init_header_str("LOCATION"),
-        get_init_header_str("BATTERY"),
-        get_init_header_str("ENVIRONMENTAL")
-    ]
-
-    open_header_list = [
-        get_open_header_str("LOCATION"),
-        get_open_header_str("BATTERY"),
-        get_open_header_str("ENVIRONMENTAL")
-    ]
-
     try:
         reset_device()
         start_pos = dut_cloud.uart.get_size()
@@ -80,10 +88,10 @@ def test_buffer_flash(dut_cloud, hex_file_buffer_flash):
         dut_cloud.uart.write(clear_str)
 
         # Header files initialized
-        dut_cloud.uart.wait_for_str(init_header_list, timeout=60, start_pos=start_pos)
+        dut_cloud.uart.wait_for_str(INIT_HEADER_MSGS, timeout=60, start_pos=start_pos)
 
         # Initial data storing
-        dut_cloud.uart.wait_for_str(storing_list, timeout=60, start_pos=start_pos)
+        dut_cloud.uart.wait_for_str(STORING_MSGS, timeout=60, start_pos=start_pos)
 
         # Location file rollover, expected on sample 9
         start_pos = dut_cloud.uart.get_size()
@@ -106,7 +114,7 @@ def test_buffer_flash(dut_cloud, hex_file_buffer_flash):
         pre_reboot_offsets = []
         try:
             offsets = dut_cloud.uart.wait_for_str_re(
-                r"Storing data in file /att_storage/ENVIRONMENTAL.*write_offset=(\d+), read_offset=(\d+)",
+                OFFSETS_RE,
                 timeout=120,
                 start_pos=start_pos,
             )
@@ -127,12 +135,12 @@ def test_buffer_flash(dut_cloud, hex_file_buffer_flash):
         reboot_start_pos = dut_cloud.uart.get_size()
 
         # Header files re-opened from existing data after reboot
-        dut_cloud.uart.wait_for_str(open_header_list, timeout=120, start_pos=reboot_start_pos)
+        dut_cloud.uart.wait_for_str(OPEN_HEADER_MSGS, timeout=120, start_pos=reboot_start_pos)
 
         # Capture write and read offsets after reboot (only using LOCATION as all types should be in sync)
         post_reboot_offsets = []
         offsets = dut_cloud.uart.wait_for_str_re(
-            r"Storing data in file /att_storage/ENVIRONMENTAL.*write_offset=(\d+), read_offset=(\d+)",
+            OFFSETS_RE,
             timeout=120,
             start_pos=reboot_start_pos,
         )
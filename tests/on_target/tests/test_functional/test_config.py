@@ -6,6 +6,7 @@
 import os
 import time
 from utils.flash_tools import flash_device, reset_device
+from utils.uart import MsgSet
 import sys
 sys.path.append(os.getcwd())
 from utils.logger import get_logger
@@ -20,25 +21,44 @@ BOOT_STORAGE_THRESHOLD = 5
 RUNTIME_SAMPLE_INTERVAL = 120
 RUNTIME_STORAGE_THRESHOLD = 3
 
+# Shadow polling backs off exponentially, from POLL_INITIAL_INTERVAL up to POLL_MAX_INTERVAL
+POLL_INITIAL_INTERVAL = 1.0
+POLL_MAX_INTERVAL = 15.0
+POLL_BACKOFF_FACTOR = 2.0
+
+# The device logs these when it applies the config, shortly before reporting it to the shadow
+BOOT_CONFIG_APPLIED_MSGS = MsgSet([
+    f"Updating sample interval to {BOOT_SAMPLE_INTERVAL} seconds",
+    f"storage: update_threshold: Updating buffer threshold limit: {BOOT_STORAGE_THRESHOLD}",
+])
+RUNTIME_CONFIG_APPLIED_MSGS = MsgSet([
+    f"Updating sample interval to {RUNTIME_SAMPLE_INTERVAL} seconds",
+    f"storage: update_threshold: Updating buffer threshold limit: {RUNTIME_STORAGE_THRESHOLD}",
+])
+
 
 def wait_for_config_reported(cloud, device_id, expected_sample, expected_threshold):
     """Poll the cloud until the device reports the expected config values."""
-    start = time.time()
+    deadline = time.monotonic() + CLOUD_TIMEOUT
+    interval = POLL_INITIAL_INTERVAL
     sample_interval = storage_threshold = None
-    while time.time() - start < CLOUD_TIMEOUT:
-        time.sleep(5)
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        interval = min(POLL_MAX_INTERVAL, interval * POLL_BACKOFF_FACTOR)
         try:
             device = cloud.get_device(device_id)
             device_state = device["state"]
-            sample_interval = device_state["reported"]["config"]["sample_interval"]
-            storage_threshold = device_state["reported"]["config"]["storage_threshold"]
+            reported_config = device_state["reported"]["config"]
+            sample_interval = reported_config["sample_interval"]
+            storage_threshold = reported_config["storage_threshold"]
         except (KeyError, TypeError) as e:
             # Expected while the device has not yet reported its shadow: the
             # `reported.config.*` keys are missing. Keep polling.
             logger.debug(f"Reported config not available yet: {e}")
             continue
 
-        logger.debug(f"Device state: {device_state}")
+        # Formatted only if a handler emits it, the shadow state can be large
+        logger.debug("Device state: %s", device_state)
 
         if (sample_interval == expected_sample and
             storage_threshold == expected_threshold):
@@ -77,7 +97,7 @@ def test_config(dut_cloud, hex_file):
         storage_threshold=BOOT_STORAGE_THRESHOLD
     )
 
-    flash_device(os.path.abspath(hex_file))
+    flash_device(hex_file)
     dut_cloud.uart.xfactoryreset()
     dut_cloud.uart.flush()
     reset_device()
@@ -90,20 +110,15 @@ def test_config(dut_cloud, hex_file):
     )
 
     try:
+        # Wait for the device to apply the config first, the shadow poll then only has to
+        # cover the report itself instead of polling while nothing can have changed yet
+        dut_cloud.uart.wait_for_str(BOOT_CONFIG_APPLIED_MSGS, timeout=120)
+
         wait_for_config_reported(
             dut_cloud.cloud, dut_cloud.device_id,
             BOOT_SAMPLE_INTERVAL, BOOT_STORAGE_THRESHOLD
         )
 
-        dut_cloud.uart.wait_for_str(
-            f"Updating sample interval to {BOOT_SAMPLE_INTERVAL} seconds",
-            timeout=120
-        )
-        dut_cloud.uart.wait_for_str(
-            f"storage: update_threshold: Updating buffer threshold limit: {BOOT_STORAGE_THRESHOLD}",
-            timeout=120
-        )
-
         # Phase 2: Runtime config update
         # Patch new config values while the device is already running and connected.
         dut_cloud.uart.flush()
@@ -116,19 +131,12 @@ def test_config(dut_cloud, hex_file):
         # Trigger a shadow delta poll via shell command so the device picks up the new config
         dut_cloud.uart.write("att_cloud poll_shadow_delta\r\n")
 
+        dut_cloud.uart.wait_for_str(RUNTIME_CONFIG_APPLIED_MSGS, timeout=120)
+
         wait_for_config_reported(
             dut_cloud.cloud, dut_cloud.device_id,
             RUNTIME_SAMPLE_INTERVAL, RUNTIME_STORAGE_THRESHOLD
         )
-
-        dut_cloud.uart.wait_for_str(
-            f"Updating sample interval to {RUNTIME_SAMPLE_INTERVAL} seconds",
-            timeout=120
-        )
-        dut_cloud.uart.wait_for_str(
-            f"storage: update_threshold: Updating buffer threshold limit: {RUNTIME_STORAGE_THRESHOLD}",
-            timeout=120
-        )
     finally:
         # Restore default config no matter what
         dut_cloud.cloud.patch_config(
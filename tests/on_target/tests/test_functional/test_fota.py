@@ -6,9 +6,12 @@
 import pytest
 import time
 import os
-import functools
+import random
+import re
+import asyncio
 from utils.flash_tools import flash_device, reset_device
 from utils.nrfcloud import NRFCloudFOTAError
+from utils.uart import MsgSet, UartLogFailure
 import sys
 sys.path.append(os.getcwd())
 from utils.logger import get_logger
@@ -45,8 +48,62 @@ APP_FOTA_TIMEOUT = 60 * 15
 BOOTLOADER_FOTA_TIMEOUT = 60 * 20
 FULL_MFW_FOTA_TIMEOUT = 60 * 30
 
-def await_nrfcloud(func, expected, field, timeout, expected_detail=None):
-    start = time.time()
+# nrfcloud polling backs off exponentially, from POLL_INITIAL_INTERVAL up to POLL_MAX_INTERVAL
+POLL_INITIAL_INTERVAL = 1.0
+POLL_MAX_INTERVAL = 15.0
+POLL_BACKOFF_FACTOR = 2.0
+
+# UART log messages, built once at import
+FOTA_DOWNLOAD_STARTED_MSG = "nrf_cloud_fota_poll: Starting FOTA download"
+LTE_OFFLINE_MSGS = MsgSet(["network: lte_lc_evt_handler: PDN connection network detached"])
+# Logged in this order once LTE is back and the download resumes
+FOTA_RESUMED_MSGS = [
+    "network: lte_lc_evt_handler: PDN connection activated",
+    "fota_download: Refuse fragment, restart with offset",
+    "fota_download: Downloading from offset:",
+]
+# Logged by the fota module when it is idle and ready to handle a poll request
+FOTA_POLL_READY_MSG = "state_waiting_for_poll_request_entry"
+# Logged by the fota module when it starts a poll, e.g. the one on every cloud connection
+FOTA_POLL_BUSY_MSG = "state_polling_for_update_entry"
+FOTA_POLL_READY_TIMEOUT = 30
+FOTA_CANCEL_MSGS = MsgSet(["Firmware download canceled", FOTA_POLL_READY_MSG])
+# Download progress, in steps of 5%. Not preceded by a digit or a dot, so that e.g. "5%" does
+# not match "25%" or a battery percentage such as "85.25%".
+FOTA_PROGRESS_RE = {p: re.compile(rf"(?<![\d.]){p}%") for p in range(0, 101, 5)}
+# Logged by the fota module when the download ends without an image to apply
+FOTA_FAILURE_MSGS = MsgSet([
+    "Firmware download failed",
+    "Firmware download timed out",
+    "Firmware update rejected",
+])
+
+# Seconds to wait before a FOTA poll trigger, doubled on every retry. The first poll only
+# waits this long if the fota module's readiness was not seen in the log.
+FOTA_POLL_INITIAL_WAIT = 2
+FOTA_RESCHEDULE_POLL_INITIAL_WAIT = 10
+
+class FOTAFailedError(Exception):
+    pass
+
+def wait_for_fota_progress(dut_fota, percentage, timeout):
+    """Wait for the download to reach percentage, failing as soon as the download fails."""
+    try:
+        dut_fota.uart.wait_for_str_re(
+            FOTA_PROGRESS_RE[percentage], timeout=timeout, failure_msgs=FOTA_FAILURE_MSGS)
+    except UartLogFailure as e:
+        raise FOTAFailedError(f"FOTA failed before reaching {percentage}%: {e}") from e
+
+async def await_nrfcloud_async(func, expected, field, timeout, expected_detail=None,
+                               initial_interval=POLL_INITIAL_INTERVAL,
+                               max_interval=POLL_MAX_INTERVAL, factor=POLL_BACKOFF_FACTOR):
+    """Poll func until it reports expected, see await_nrfcloud().
+
+    func is a blocking REST call and runs in a worker thread, so other waits can progress on
+    the same event loop while a request is in flight.
+    """
+    deadline = time.monotonic() + timeout
+    interval = initial_interval
     if expected_detail is not None:
         logger.info(
             f"Awaiting {field} == {expected} and "
@@ -55,11 +112,11 @@ def await_nrfcloud(func, expected, field, timeout, expected_detail=None):
     else:
         logger.info(f"Awaiting {field} == {expected} in nrfcloud shadow...")
     while True:
-        time.sleep(5)
-        if time.time() - start > timeout:
+        await asyncio.sleep(interval)
+        if time.monotonic() > deadline:
             if expected_detail is not None:
                 try:
-                    data = func()
+                    data = await asyncio.to_thread(func)
                     if isinstance(data, dict):
                         status = data.get("status", "<missing>")
                         status_detail = data.get("statusDetail", "<missing>")
@@ -75,10 +132,12 @@ def await_nrfcloud(func, expected, field, timeout, expected_detail=None):
                     f"Got status: {status!r}, statusDetail: {status_detail!r}")
             raise RuntimeError(f"Timeout awaiting {field} update")
         try:
-            data = func()
+            data = await asyncio.to_thread(func)
         except Exception as e:
+            # Retry at the same interval, the request failed rather than returned a stale value
             logger.warning(f"Exception {e} during waiting for {field}")
             continue
+        interval = min(max_interval, interval * factor)
         if expected_detail is not None:
             if not isinstance(data, dict):
                 logger.warning(
@@ -95,50 +154,120 @@ def await_nrfcloud(func, expected, field, timeout, expected_detail=None):
                     f"{field} matched {expected!r} but unexpected statusDetail: "
                     f"{status_detail!r} (expected {expected_detail!r})")
         else:
-            logger.debug(f"Reported {field}: {data}")
+            # Formatted only if a handler emits it, data can be a whole response
+            logger.debug("Reported %s: %s", field, data)
             if expected in data:
                 break
 
-def await_fota_job_succeeded(dut_fota, job_id, timeout):
-    """Wait for FOTA job to complete and the device execution to succeed."""
-    await_nrfcloud(
-        functools.partial(dut_fota.fota.get_fota_status, job_id),
+def await_nrfcloud(func, expected, field, timeout, expected_detail=None,
+                   initial_interval=POLL_INITIAL_INTERVAL,
+                   max_interval=POLL_MAX_INTERVAL, factor=POLL_BACKOFF_FACTOR):
+    """Poll func until the value it returns contains expected.
+
+    field names the value in log and error messages. If expected_detail is given, func must
+    return a dict whose "status" contains expected and whose "statusDetail" equals
+    expected_detail. Polls start initial_interval seconds apart and back off by factor up to
+    max_interval. Raises RuntimeError if expected is not reported within timeout seconds.
+    """
+    asyncio.run(await_nrfcloud_async(
+        func, expected, field, timeout, expected_detail=expected_detail,
+        initial_interval=initial_interval, max_interval=max_interval, factor=factor))
+
+async def await_fota_job_succeeded_async(dut_fota, job_id, timeout):
+    # Bound once and shared by the waits below
+    fota = dut_fota.fota
+    device_id = dut_fota.device_id
+
+    def get_status():
+        return fota.get_fota_status(job_id)
+
+    def get_execution():
+        return fota.get_fota_execution(device_id, job_id)
+
+    await await_nrfcloud_async(
+        get_status,
         "IN_PROGRESS",
         "FOTA status",
         timeout
     )
-    await_nrfcloud(
-        functools.partial(dut_fota.fota.get_fota_status, job_id),
+    await await_nrfcloud_async(
+        get_status,
         "COMPLETED",
         "FOTA status",
         timeout
     )
-    await_nrfcloud(
-        functools.partial(dut_fota.fota.get_fota_execution, dut_fota.device_id, job_id),
+    await await_nrfcloud_async(
+        get_execution,
         "SUCCEEDED",
         "FOTA execution status",
         timeout,
         expected_detail=FOTA_STATUS_DETAIL_SUCCESS,
     )
 
+def await_fota_job_succeeded(dut_fota, job_id, timeout):
+    """Wait for FOTA job to complete and the device execution to succeed."""
+    asyncio.run(await_fota_job_succeeded_async(dut_fota, job_id, timeout))
+
+async def await_fota_job_and_version_async(dut_fota, job_id, timeout, version_func, new_version, field):
+    version_timeout = timeout + DEVICE_MSG_TIMEOUT
+
+    def get_version():
+        return version_func(dut_fota)
+
+    async def await_version():
+        try:
+            await await_nrfcloud_async(
+                get_version,
+                new_version,
+                field,
+                version_timeout
+            )
+        except RuntimeError:
+            logger.error(f"Version is not {new_version} after {version_timeout}s")
+            raise
+
+    tasks = [
+        asyncio.create_task(await_fota_job_succeeded_async(dut_fota, job_id, timeout)),
+        asyncio.create_task(await_version()),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            task.result()
+    finally:
+        # Don't leave the other wait polling when one of them failed
+        for task in tasks:
+            task.cancel()
+
+def await_fota_job_and_version(dut_fota, job_id, timeout, version_func, new_version, field):
+    """Wait for FOTA job to succeed and, at the same time, for the device to report new_version.
+
+    The device reports the new version at about the time the job completes, so the two
+    waits run concurrently on one event loop instead of one after the other.
+    """
+    asyncio.run(await_fota_job_and_version_async(
+        dut_fota, job_id, timeout, version_func, new_version, field))
+
+def get_device_info(dut_fota):
+    shadow = dut_fota.fota.get_device_cached(dut_fota.device_id)
+    return shadow["state"]["reported"]["device"]["deviceInfo"]
+
 def get_appversion(dut_fota):
-    shadow = dut_fota.fota.get_device(dut_fota.device_id)
-    return shadow["state"]["reported"]["device"]["deviceInfo"]["appVersion"]
+    return get_device_info(dut_fota)["appVersion"]
 
 def get_modemversion(dut_fota):
-    shadow = dut_fota.fota.get_device(dut_fota.device_id)
-    return shadow["state"]["reported"]["device"]["deviceInfo"]["modemFirmware"]
+    return get_device_info(dut_fota)["modemFirmware"]
 
 def get_bootloaderversion(dut_fota):
-    shadow = dut_fota.fota.get_device(dut_fota.device_id)
-    return shadow["state"]["reported"]["device"]["deviceInfo"]["bootloaderVersion"]
+    return get_device_info(dut_fota)["bootloaderVersion"]
 
 def await_bootloader_version(dut_fota, expected, timeout=DEVICE_MSG_TIMEOUT):
-    start = time.time()
+    deadline = time.monotonic() + timeout
+    interval = POLL_INITIAL_INTERVAL
     logger.info(f"Awaiting bootloaderVersion == {expected} in nrfcloud shadow...")
     while True:
-        time.sleep(5)
-        if time.time() - start > timeout:
+        time.sleep(interval)
+        if time.monotonic() > deadline:
             raise RuntimeError(
                 f"Timeout awaiting bootloaderVersion == {expected}")
         try:
@@ -152,6 +281,7 @@ def await_bootloader_version(dut_fota, expected, timeout=DEVICE_MSG_TIMEOUT):
         logger.debug(f"Reported bootloaderVersion: {version}")
         if version == expected:
             return
+        interval = min(POLL_MAX_INTERVAL, interval * POLL_BACKOFF_FACTOR)
 
 def restore_device_after_modem_fota(dut_fota, hex_file):
     """Return the DUT to a known-good state after modem FOTA tests."""
@@ -170,7 +300,7 @@ def restore_device_after_modem_fota(dut_fota, hex_file):
         logger.warning(f"Failed to cancel pending FOTA jobs during restore: {e}")
 
     flash_device(os.path.abspath(MFW_FILEPATH))
-    flash_device(os.path.abspath(hex_file))
+    flash_device(hex_file)
 
     try:
         dut_fota.uart.xfactoryreset()
@@ -185,12 +315,33 @@ def restore_device_after_modem_fota(dut_fota, hex_file):
     except Exception as e:
         logger.warning(f"Failed to cancel pending FOTA jobs after restore: {e}")
 
-def trigger_fota_poll(dut_fota, max_attempts=3):
-    for _ in range(max_attempts):
+def trigger_fota_poll(dut_fota, ready_pos, initial_wait=FOTA_POLL_INITIAL_WAIT, max_attempts=3):
+    """Trigger FOTA polls until the device starts downloading.
+
+    The first poll is sent as soon as the fota module is idle: once it has logged, after
+    ready_pos and after its last poll, that it waits for a poll request. The module only logs
+    this when it enters the state, so take ready_pos at the boot the test waits on, or before
+    a cancel or an update reboot that sends the module back to idle. The wait before each
+    retry doubles from initial_wait, with up to a second of jitter so retries don't line up
+    with the server's cadence.
+    """
+    # A poll still in progress returns to idle when it ends, wait for that instead
+    busy_pos = dut_fota.uart.log.rfind(FOTA_POLL_BUSY_MSG, ready_pos)
+    try:
+        dut_fota.uart.wait_for_str(FOTA_POLL_READY_MSG, timeout=FOTA_POLL_READY_TIMEOUT,
+                                   start_pos=max(ready_pos, busy_pos))
+        ready = True
+    except AssertionError:
+        logger.warning(f"{FOTA_POLL_READY_MSG} not seen, polling after {initial_wait}s instead")
+        ready = False
+
+    for attempt in range(max_attempts):
         try:
-            time.sleep(10)
+            if attempt or not ready:
+                time.sleep(initial_wait * 2 ** attempt + random.uniform(0, 1))
+            start_pos = dut_fota.uart.get_size()
             dut_fota.uart.write("att_fota poll\r\n")
-            dut_fota.uart.wait_for_str("nrf_cloud_fota_poll: Starting FOTA download", timeout=30)
+            dut_fota.uart.wait_for_str(FOTA_DOWNLOAD_STARTED_MSG, timeout=30, start_pos=start_pos)
             return
         except AssertionError:
             continue
@@ -198,34 +349,29 @@ def trigger_fota_poll(dut_fota, max_attempts=3):
 
 def perform_disconnect_reconnect(dut_fota, expected_percentage):
     """Helper function to perform a disconnect/reconnect sequence and verify resumption at expected percentage"""
-    patterns_lte_offline = ["network: lte_lc_evt_handler: PDN connection network detached"]
-    patterns_lte_normal = ["network: lte_lc_evt_handler: PDN connection activated"]
-
     logger.info(f"Disconnecting at {expected_percentage}% - device should resume at same percentage")
 
     # LTE disconnect
     dut_fota.uart.flush()
     dut_fota.uart.write("att_network disconnect\r\n")
-    dut_fota.uart.wait_for_str(patterns_lte_offline, timeout=20)
+    dut_fota.uart.wait_for_str(LTE_OFFLINE_MSGS, timeout=20)
 
     # LTE reconnect
     dut_fota.uart.flush()
     dut_fota.uart.write("att_network connect\r\n")
-    dut_fota.uart.wait_for_str(patterns_lte_normal, timeout=120)
-    dut_fota.uart.wait_for_str("fota_download: Refuse fragment, restart with offset", timeout=600)
-    dut_fota.uart.wait_for_str("fota_download: Downloading from offset:", timeout=600)
+    dut_fota.uart.wait_for_str_ordered(FOTA_RESUMED_MSGS, timeout=720)
 
     # Verify resumption starts at or very close to the expected percentage
     # Look for the next percentage update to confirm we're resuming properly
     next_percentage = expected_percentage + 5
     try:
         # Wait for the next percentage (or same percentage if we're exactly at boundary)
-        dut_fota.uart.wait_for_str(f"{expected_percentage}%", timeout=60)
+        dut_fota.uart.wait_for_str_re(FOTA_PROGRESS_RE[expected_percentage], timeout=60)
         logger.info(f"✓ Verified: Resumed at {expected_percentage}% as expected")
     except AssertionError:
         try:
             # If we don't see the exact percentage, look for the next one
-            dut_fota.uart.wait_for_str(f"{next_percentage}%", timeout=60)
+            dut_fota.uart.wait_for_str_re(FOTA_PROGRESS_RE[next_percentage], timeout=60)
             logger.info(f"✓ Verified: Resumed correctly, now at {next_percentage}%")
         except AssertionError:
             logger.error(f"✗ Failed to verify resumption at expected percentage {expected_percentage}%")
@@ -234,7 +380,7 @@ def perform_disconnect_reconnect(dut_fota, expected_percentage):
 def run_fota_resumption(dut_fota, fota_type):
     if fota_type == "app":
         timeout_50_percent = APP_FOTA_TIMEOUT/2
-        dut_fota.uart.wait_for_str("50%", timeout=timeout_50_percent)
+        wait_for_fota_progress(dut_fota, 50, timeout_50_percent)
         logger.debug(f"Testing fota resumption on disconnect for {fota_type} fota")
 
         perform_disconnect_reconnect(dut_fota, 50)
@@ -244,48 +390,39 @@ def run_fota_resumption(dut_fota, fota_type):
 
         # First disconnect at 20%
         timeout_20_percent = FULL_MFW_FOTA_TIMEOUT * 0.2
-        dut_fota.uart.wait_for_str("20%", timeout=timeout_20_percent)
+        wait_for_fota_progress(dut_fota, 20, timeout_20_percent)
         logger.info(f"Performing first disconnect/reconnect at 20%")
         perform_disconnect_reconnect(dut_fota, 20)
 
         # Second disconnect at 80%
         timeout_80_percent = FULL_MFW_FOTA_TIMEOUT * 0.6  # Additional 60% of total timeout
-        dut_fota.uart.wait_for_str("80%", timeout=timeout_80_percent)
+        wait_for_fota_progress(dut_fota, 80, timeout_80_percent)
         logger.info(f"Performing second disconnect/reconnect at 80%")
         perform_disconnect_reconnect(dut_fota, 80)
 
 def run_fota_reschedule(dut_fota, fota_type):
-    dut_fota.uart.wait_for_str("5%", timeout=APP_FOTA_TIMEOUT)
+    wait_for_fota_progress(dut_fota, 5, APP_FOTA_TIMEOUT)
     logger.debug(f"Cancelling FOTA, type: {fota_type}")
 
-    dut_fota.fota.cancel_fota_job(dut_fota.data['job_id'])
+    job_id = dut_fota.data['job_id']
+    cancel_pos = dut_fota.uart.get_size()
+    dut_fota.fota.cancel_fota_job(job_id)
 
     await_nrfcloud(
-        functools.partial(dut_fota.fota.get_fota_status, dut_fota.data['job_id']),
+        lambda: dut_fota.fota.get_fota_status(job_id),
         "CANCELLED",
         "FOTA status",
         APP_FOTA_TIMEOUT
     )
 
-    patterns_fota_cancel = ["Firmware download canceled", "state_waiting_for_poll_request_entry"]
-
-    dut_fota.uart.wait_for_str(patterns_fota_cancel, timeout=180)
+    dut_fota.uart.wait_for_str(FOTA_CANCEL_MSGS, timeout=180, start_pos=cancel_pos)
 
     dut_fota.data['job_id'] = dut_fota.fota.create_fota_job(dut_fota.device_id, dut_fota.data['bundle_id'])
 
     logger.info(f"Rescheduled FOTA Job (ID: {dut_fota.data['job_id']})")
 
-    # Sleep a bit and trigger fota poll
-    for i in range(3):
-        try:
-            time.sleep(30)
-            dut_fota.uart.write("att_fota poll\r\n")
-            dut_fota.uart.wait_for_str("nrf_cloud_fota_poll: Starting FOTA download")
-            break
-        except AssertionError:
-            continue
-    else:
-        raise AssertionError(f"Fota update not available after {i} attempts")
+    # FOTA_CANCEL_MSGS saw the module go idle, retries give the device longer to settle
+    trigger_fota_poll(dut_fota, cancel_pos, initial_wait=FOTA_RESCHEDULE_POLL_INITIAL_WAIT)
 
 @pytest.fixture(autouse=True)
 def ensure_no_pending_fota_jobs_before_test(dut_fota):
@@ -295,9 +432,10 @@ def ensure_no_pending_fota_jobs_before_test(dut_fota):
 @pytest.fixture
 def run_fota_fixture(dut_fota, hex_file, reschedule=False):
     def _run_fota(bundle_id="", fota_type="app", fotatimeout=APP_FOTA_TIMEOUT, new_version=TEST_APP_VERSION, reschedule=False):
-        flash_device(os.path.abspath(hex_file))
+        flash_device(hex_file)
         dut_fota.uart.xfactoryreset()
         dut_fota.uart.flush()
+        boot_pos = dut_fota.uart.get_size()
         reset_device()
 
         dut_fota.uart.wait_for_str_with_retries("Connected to Cloud", max_retries=3, timeout=240, reset_func=reset_device)
@@ -311,7 +449,7 @@ def run_fota_fixture(dut_fota, hex_file, reschedule=False):
             pytest.skip(f"FOTA create_job REST API error: {e}")
         logger.info(f"Created FOTA Job (ID: {dut_fota.data['job_id']})")
 
-        trigger_fota_poll(dut_fota)
+        trigger_fota_poll(dut_fota, boot_pos)
 
         if reschedule:
             run_fota_reschedule(dut_fota, fota_type)
@@ -320,26 +458,15 @@ def run_fota_fixture(dut_fota, hex_file, reschedule=False):
             run_fota_resumption(dut_fota, "app")
         elif fota_type == "full":
             run_fota_resumption(dut_fota, "full")
-        await_fota_job_succeeded(dut_fota, dut_fota.data['job_id'], fotatimeout)
-
-        try:
-            if fota_type == "app":
-                await_nrfcloud(
-                    functools.partial(get_appversion, dut_fota),
-                    new_version,
-                    "appVersion",
-                    DEVICE_MSG_TIMEOUT
-                )
-            else:
-                await_nrfcloud(
-                    functools.partial(get_modemversion, dut_fota),
-                    new_version,
-                    "modemFirmware",
-                    DEVICE_MSG_TIMEOUT
-                )
-        except RuntimeError as e:
-            logger.error(f"Version is not {new_version} after {DEVICE_MSG_TIMEOUT}s")
-            raise e
+        # The download is under way, the fota module only goes idle again after the update
+        # reboot
+        update_pos = dut_fota.uart.get_size()
+        if fota_type == "app":
+            await_fota_job_and_version(dut_fota, dut_fota.data['job_id'], fotatimeout,
+                                       get_appversion, new_version, "appVersion")
+        else:
+            await_fota_job_and_version(dut_fota, dut_fota.data['job_id'], fotatimeout,
+                                       get_modemversion, new_version, "modemFirmware")
 
         if fota_type == "delta":
             # Run a second delta fota back from FOTA-TEST
@@ -351,24 +478,13 @@ def run_fota_fixture(dut_fota, hex_file, reschedule=False):
                 pytest.skip(f"FOTA create_job REST API error: {e}")
             logger.info(f"Created FOTA Job (ID: {dut_fota.data['job_id']})")
 
-            # Sleep a bit and trigger fota poll
-            dut_fota.uart.flush()
-            for i in range(3):
-                try:
-                    time.sleep(10)
-                    dut_fota.uart.write("att_fota poll\r\n")
-                    dut_fota.uart.wait_for_str("nrf_cloud_fota_poll: Starting FOTA download", timeout=30)
-                    break
-                except AssertionError:
-                    continue
-            else:
-                raise AssertionError(f"Fota update not available after {i} attempts")
+            trigger_fota_poll(dut_fota, update_pos)
 
             await_fota_job_succeeded(dut_fota, dut_fota.data['job_id'], fotatimeout)
 
             try:
                 await_nrfcloud(
-                    functools.partial(get_modemversion, dut_fota),
+                    lambda: get_modemversion(dut_fota),
                     MFW_VERSION,
                     "modemFirmware",
                     DEVICE_MSG_TIMEOUT
@@ -398,9 +514,10 @@ def test_bootloader_fota(dut_fota, hex_file):
         pytest.skip("MCUBOOT_BUNDLEID environment variable not set")
 
     try:
-        flash_device(os.path.abspath(hex_file))
+        flash_device(hex_file)
         dut_fota.uart.xfactoryreset()
         dut_fota.uart.flush()
+        boot_pos = dut_fota.uart.get_size()
         reset_device()
 
         dut_fota.uart.wait_for_str_with_retries(
@@ -418,7 +535,7 @@ def test_bootloader_fota(dut_fota, hex_file):
             pytest.skip(f"FOTA create_job REST API error: {e}")
         logger.info(f"Created bootloader FOTA job (ID: {dut_fota.data['job_id']})")
 
-        trigger_fota_poll(dut_fota)
+        trigger_fota_poll(dut_fota, boot_pos)
 
         dut_fota.uart.wait_for_str("fota_download: B1 update, selected", timeout=120)
         dut_fota.uart.wait_for_str("Download complete", timeout=BOOTLOADER_FOTA_TIMEOUT)
@@ -439,7 +556,7 @@ def test_bootloader_fota(dut_fota, hex_file):
         await_bootloader_version(dut_fota, BOOTLOADER_VERSION_UPDATED,
                                  timeout=BOOTLOADER_FOTA_TIMEOUT)
     finally:
-        flash_device(os.path.abspath(hex_file))
+        flash_device(hex_file)
 
 def test_delta_mfw_fota(dut_fota, run_fota_fixture, hex_file):
     '''
@@ -6,8 +6,11 @@
 import pytest
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from utils.flash_tools import flash_device, reset_device
 from utils.logger import get_logger
 from datetime import datetime, timezone
@@ -17,20 +20,34 @@ MEMFAULT_ORG = os.getenv('MEMFAULT_ORGANIZATION_SLUG')
 MEMFAULT_PROJ = os.getenv('MEMFAULT_PROJECT_SLUG')
 UUID = os.getenv('UUID')
 MEMFAULT_TIMEOUT = 5 * 60
+MEMFAULT_REQUEST_TIMEOUT = 10
+MODEM_TRACE_CHUNK_SIZE = 64 * 1024
 
 logger = get_logger()
 
 url = "https://api.memfault.com/api/v0"
+project_url = f"{url}/organizations/{MEMFAULT_ORG}/projects/{MEMFAULT_PROJ}"
 auth = ("", MEMFAULT_ORG_TOKEN)
 
+# One keep-alive session for all polls, so they don't each pay for a new TLS connection
+session = requests.Session()
+session.auth = auth
+session.mount("https://", HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+))
+
 def convert_binary_trace_to_pcap(binary_trace, pcapng_file):
     logger.info(f"Converting modem trace to pcap")
     try:
+        # Only stderr is reported, on failure. Progress output on stdout is dropped unread.
         result = subprocess.run(
             ['nrfutil', 'trace', 'lte', '--input-file', binary_trace, '--output-pcapng', pcapng_file],
             check=True,
             text=True,
-            capture_output=True
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
         )
         logger.info("Command completed successfully.")
     except subprocess.CalledProcessError as e:
@@ -41,17 +58,18 @@ def convert_binary_trace_to_pcap(binary_trace, pcapng_file):
         raise
 
 def fetch_recent_modem_trace(device_id, start_time, end_time):
-    r = requests.get(
-        f"{url}/organizations/{MEMFAULT_ORG}/projects/{MEMFAULT_PROJ}/devices/{device_id}/custom-data-recordings?end_time={end_time}&page=1&per_page=1&start_time={start_time}",
-        auth=auth
+    r = session.get(
+        f"{project_url}/devices/{device_id}/custom-data-recordings",
+        params={"end_time": end_time, "page": 1, "per_page": 1, "start_time": start_time},
+        timeout=MEMFAULT_REQUEST_TIMEOUT
     )
 
     # Print the request URL for debugging
     logger.debug(f"Request URL: {r.url}")
     # Print the response status code for debugging
     logger.debug(f"Response status code: {r.status_code}")
-    # Print the response content for debugging
-    logger.debug(f"Response content: {r.content}")
+    # Print the response content for debugging, formatted only if a handler emits it
+    logger.debug("Response content: %s", r.content)
 
     r.raise_for_status()
     response = r.json()
@@ -68,35 +86,71 @@ def fetch_recent_modem_trace(device_id, start_time, end_time):
 
     return None
 
-def get_traces(family, device_id):
-    r = requests.get(
-        f"{url}/organizations/{MEMFAULT_ORG}/projects/{MEMFAULT_PROJ}/traces", auth=auth)
+def get_latest_trace(family, device_id):
+    # Traces are listed newest first, only the first one of the device is needed
+    r = session.get(
+        f"{project_url}/traces",
+        timeout=MEMFAULT_REQUEST_TIMEOUT)
     r.raise_for_status()
-    data = r.json()["data"]
-    latest_traces = [
-        x
-        for x in data
-        if x["device"]["device_serial"] == str(device_id) and x["source_type"] == family
-    ]
-    return latest_traces
+    device_serial = str(device_id)
+    return next(
+        (x for x in r.json()["data"]
+         if x["device"]["device_serial"] == device_serial and x["source_type"] == family),
+        None
+    )
 
-def get_latest_coredump_traces(device_id):
-    return get_traces("coredump", device_id)
+def get_latest_coredump_trace(device_id):
+    return get_latest_trace("coredump", device_id)
 
 def timestamp(event):
-    return datetime.strptime(
-        event["captured_date"], "%Y-%m-%dT%H:%M:%S.%f%z"
-    )
+    # captured_date is ISO 8601, which fromisoformat() parses much faster than strptime()
+    return datetime.fromisoformat(event["captured_date"])
+
+def wait_for_new_coredump(timestamp_old_coredump):
+    # Wait for upload to be reported to memfault api
+    deadline = time.monotonic() + MEMFAULT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(5)
+        coredump = get_latest_coredump_trace(UUID)
+        # Formatted only if a handler emits it, a trace record can be large
+        logger.debug("Found coredump: %s", coredump)
+        timestamp_new_coredump = timestamp(coredump) if coredump else  None
+        logger.debug(f"Timestamp new coredump: {timestamp_new_coredump}")
+
+        if not coredump:
+            continue
+        # Check that we have an upload with newer timestamp
+        if not timestamp_old_coredump:
+            return
+        if timestamp_new_coredump > timestamp_old_coredump:
+            return
+    raise RuntimeError("No new coredump observed")
+
+def wait_for_modem_trace(start_time):
+    # Wait for modem trace to be reported to memfault api
+    deadline = time.monotonic() + MEMFAULT_TIMEOUT
+
+    while time.monotonic() < deadline:
+
+        now = datetime.now(timezone.utc)
+        end_time = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        modem_trace_id = fetch_recent_modem_trace(UUID, end_time, start_time)
+        if modem_trace_id:
+            print(f"Found modem trace with ID {modem_trace_id}")
+            return modem_trace_id
+        time.sleep(5)
+    raise RuntimeError("No modem trace observed")
 
 @pytest.mark.slow
 def test_memfault(dut_board, debug_hex_file):
     # Save timestamp of latest coredump
-    coredumps = get_latest_coredump_traces(UUID)
-    logger.debug(f"Found coredumps: {coredumps}")
-    timestamp_old_coredump = timestamp(coredumps[0]) if coredumps else  None
+    coredump = get_latest_coredump_trace(UUID)
+    logger.debug("Found coredump: %s", coredump)
+    timestamp_old_coredump = timestamp(coredump) if coredump else  None
     logger.debug(f"Timestamp old coredump: {timestamp_old_coredump}")
 
-    flash_device(os.path.abspath(debug_hex_file))
+    flash_device(debug_hex_file)
     dut_board.uart.xfactoryreset()
     dut_board.uart.flush()
     reset_device()
@@ -112,52 +166,25 @@ def test_memfault(dut_board, debug_hex_file):
     # Trigger usage fault to generate coredump
     dut_board.uart.write("mflt test usagefault\r\n")
 
-    # Wait for upload to be reported to memfault api
-    start = time.time()
-    while time.time() - start < MEMFAULT_TIMEOUT:
-            time.sleep(5)
-            coredumps = get_latest_coredump_traces(UUID)
-            logger.debug(f"Found coredumps: {coredumps}")
-            timestamp_new_coredump = timestamp(coredumps[0]) if coredumps else  None
-            logger.debug(f"Timestamp new coredump: {timestamp_new_coredump}")
-
-            if not coredumps:
-                continue
-            # Check that we have an upload with newer timestamp
-            if not timestamp_old_coredump:
-                break
-            if timestamp(coredumps[0]) > timestamp_old_coredump:
-                break
-    else:
-        raise RuntimeError("No new coredump observed")
-
-    # Wait for modem trace to be reported to memfault api
-    start = time.time()
-
-    while time.time() - start < MEMFAULT_TIMEOUT:
-
-        now = datetime.now(timezone.utc)
-        end_time = now.strftime("%Y-%m-%dT%H:%M:%SZ")
-
-        modem_trace_id = fetch_recent_modem_trace(UUID, end_time, start_time)
-        if modem_trace_id:
-            print(f"Found modem trace with ID {modem_trace_id}")
-            break
-        time.sleep(5)
-    else:
-        raise RuntimeError("No modem trace observed")
+    # The device uploads the coredump and the modem trace at about the same time, wait for
+    # both at once rather than one after the other
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        coredump_future = executor.submit(wait_for_new_coredump, timestamp_old_coredump)
+        modem_trace_future = executor.submit(wait_for_modem_trace, start_time)
+        coredump_future.result()
+        modem_trace_id = modem_trace_future.result()
 
-    # Download modem trace
-    r = requests.get(
-        f"{url}/organizations/{MEMFAULT_ORG}/projects/{MEMFAULT_PROJ}/custom-data-recording/{modem_trace_id}/download",
-        auth=auth
-    )
-    r.raise_for_status()
-
-    # Save the binary trace to a file
+    # Download modem trace, streamed to the file instead of held in memory as a whole
     binary_trace_path = f"modem_trace_{modem_trace_id}.bin"
-    with open(binary_trace_path, "wb") as f:
-        f.write(r.content)
+    with session.get(
+        f"{project_url}/custom-data-recording/{modem_trace_id}/download",
+        timeout=MEMFAULT_REQUEST_TIMEOUT,
+        stream=True
+    ) as r:
+        r.raise_for_status()
+        with open(binary_trace_path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=MODEM_TRACE_CHUNK_SIZE):
+                f.write(chunk)
     logger.info(f"Saved modem trace to {binary_trace_path}")
     # Convert the binary trace to pcapng format
     pcapng_file = f"modem_trace_{modem_trace_id}.pcapng"
@@ -166,11 +193,13 @@ def test_memfault(dut_board, debug_hex_file):
     # Clean up the binary trace file
     os.remove(binary_trace_path)
     logger.info(f"Removed {binary_trace_path}")
-    # Check if the pcapng file exists
-    assert os.path.exists(pcapng_file), f"Failed to create {pcapng_file}"
+    # Check that the pcapng file exists and is not empty, with a single stat
+    try:
+        pcapng_size = os.stat(pcapng_file).st_size
+    except FileNotFoundError:
+        pytest.fail(f"Failed to create {pcapng_file}")
     logger.info(f"Successfully created {pcapng_file}")
-    # Check if the pcapng file is not empty
-    assert os.path.getsize(pcapng_file) > 0, f"{pcapng_file} is empty"
+    assert pcapng_size > 0, f"{pcapng_file} is empty"
     logger.info(f"{pcapng_file} is not empty")
     # Clean up the pcapng file
     os.remove(pcapng_file)
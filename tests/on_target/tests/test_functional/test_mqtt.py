@@ -22,7 +22,7 @@ def test_mqtt_firmware(dut_board, hex_file_mqtt):
         pytest.skip("This test is only for thingy91x devices")
 
     # Flash the firmware
-    flash_device(os.path.abspath(hex_file_mqtt))
+    flash_device(hex_file_mqtt)
     dut_board.uart.xfactoryreset()
 
     # Log patterns to check
@@ -6,14 +6,33 @@
 import os
 import sys
 from utils.flash_tools import flash_device, reset_device
+from utils.uart import MsgSet
 
 sys.path.append(os.getcwd())
 from utils.logger import get_logger
 
 logger = get_logger()
 
+# Sampling happens at boot while disconnected
+BOOT_SAMPLING_MSGS = MsgSet([
+    "Environmental values sample request received, getting data",
+    "WiFi APs",
+])
+
+# Stored data is dispatched to cloud upon connection
+_PATTERNS_AFTER_CONNECT = [
+    "state_polling_for_update_entry",
+    "Configuration: Requesting device shadow desired from cloud",
+    "cloud: handle_cloud_location_request: Handling cloud location request",
+]
+AFTER_CONNECT_MSGS = MsgSet(_PATTERNS_AFTER_CONNECT)
+THINGY91X_AFTER_CONNECT_MSGS = MsgSet(_PATTERNS_AFTER_CONNECT + [
+    "Battery data sent to cloud",
+    "Environmental data sent to cloud",
+])
+
 def test_sampling(dut_board, hex_file):
-    flash_device(os.path.abspath(hex_file))
+    flash_device(hex_file)
     dut_board.uart.xfactoryreset()
 
     devicetype = os.getenv("DUT_DEVICE_TYPE")
@@ -23,32 +42,17 @@ def test_sampling(dut_board, hex_file):
 
     # Sampling happens at boot while disconnected
     if devicetype == "thingy91x":
-        dut_board.uart.wait_for_str(
-            [
-                "Environmental values sample request received, getting data",
-                "WiFi APs",
-            ],
-            timeout=120,
-        )
+        dut_board.uart.wait_for_str(BOOT_SAMPLING_MSGS, timeout=120)
 
     dut_board.uart.wait_for_str_with_retries(
         "Connected to Cloud", max_retries=3, timeout=240, reset_func=reset_device
     )
 
     # Stored data is dispatched to cloud upon connection
-    patterns_after_connect = [
-        "state_polling_for_update_entry",
-        "Configuration: Requesting device shadow desired from cloud",
-        "cloud: handle_cloud_location_request: Handling cloud location request",
-    ]
-
     if devicetype == "thingy91x":
-        patterns_after_connect.extend([
-            "Battery data sent to cloud",
-            "Environmental data sent to cloud",
-        ])
-
-    dut_board.uart.wait_for_str(patterns_after_connect, timeout=120)
+        dut_board.uart.wait_for_str(THINGY91X_AFTER_CONNECT_MSGS, timeout=120)
+    else:
+        dut_board.uart.wait_for_str(AFTER_CONNECT_MSGS, timeout=120)
 
     # Verify periodic sampling is scheduled after the first sample
     dut_board.uart.wait_for_str("Next sample trigger in", timeout=30)
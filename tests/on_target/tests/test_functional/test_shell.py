@@ -6,7 +6,6 @@
 import os
 import time
 import pytest
-from utils.flash_tools import flash_device, reset_device
 import sys
 sys.path.append(os.getcwd())
 from utils.logger import get_logger
@@ -15,15 +14,12 @@ logger = get_logger()
 
 CLOUD_TIMEOUT = 60 * 3
 
-def test_shell(dut_cloud, hex_file):
+@pytest.mark.skipif(os.getenv("DUT_DEVICE_TYPE") != "thingy91x", reason="Shell test runs on thingy91x only")
+def test_shell(connected_dut):
     '''
     Test that the device is operating normally using shell commands
     '''
-    if os.getenv("DUT_DEVICE_TYPE") != "thingy91x":
-        pytest.skip("Shell test runs on thingy91x only")
-
-    flash_device(os.path.abspath(hex_file))
-    dut_cloud.uart.xfactoryreset()
+    dut_cloud = connected_dut
 
     patterns_button_press = [
         "main: connected_sampling_entry: connected_sampling_entry",
@@ -38,14 +34,6 @@ def test_shell(dut_cloud, hex_file):
         "network: lte_lc_evt_handler: PDN connection activated",
     ]
 
-    # Boot
-    dut_cloud.uart.flush()
-    reset_device()
-
-    # Wait for cloud connection, with retries if it fails
-    dut_cloud.uart.flush()
-    dut_cloud.uart.wait_for_str_with_retries("Connected to Cloud", max_retries=3, timeout=240, reset_func=reset_device)
-
     # Wait until connected and ready to sample
     dut_cloud.uart.flush()
     dut_cloud.uart.wait_for_str("handle_storage_batch_available: No more data available in batch", timeout=120)
@@ -63,8 +51,8 @@ def test_shell(dut_cloud, hex_file):
     messages = dut_cloud.cloud.get_messages(dut_cloud.device_id, appname="donald", max_records=20, max_age_hrs=0.25)
 
     # Wait for message to be reported to cloud
-    start = time.time()
-    while time.time() - start < CLOUD_TIMEOUT:
+    deadline = time.monotonic() + CLOUD_TIMEOUT
+    while time.monotonic() < deadline:
         time.sleep(5)
         messages = dut_cloud.cloud.get_messages(dut_cloud.device_id, appname="donald", max_records=20, max_age_hrs=0.25)
         logger.debug(f"Found messages: {messages}")
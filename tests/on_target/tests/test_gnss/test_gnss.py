@@ -4,6 +4,7 @@
 ##########################################################################################
 
 import os
+import re
 import pytest
 from utils.flash_tools import flash_device, reset_device
 import sys
@@ -12,6 +13,10 @@ from utils.logger import get_logger
 
 logger = get_logger()
 
+LOCATION_RE = re.compile(
+    r"location_module: location_event_handler: Got location: lat: (\d+\.\d+), lon: (\d+\.\d+), acc: (\d+\.\d+), method: ([a-zA-Z]+)"
+)
+
 def test_gnss(dut_board, hex_file_ext_gnss):
     '''
     Test that the device gets a GNSS fix and reports its location.
@@ -19,7 +24,7 @@ def test_gnss(dut_board, hex_file_ext_gnss):
     Check that the reported location is within a reasonable range of the expected location.
     '''
 
-    flash_device(os.path.abspath(hex_file_ext_gnss))
+    flash_device(hex_file_ext_gnss)
     dut_board.uart.xfactoryreset()
 
     dut_board.uart.wait_for_str_with_retries(
@@ -28,9 +33,7 @@ def test_gnss(dut_board, hex_file_ext_gnss):
         timeout=120,
         reset_func=reset_device)
 
-    res = dut_board.uart.extract_value(
-        r"location_module: location_event_handler: Got location: lat: (\d+\.\d+), lon: (\d+\.\d+), acc: (\d+\.\d+), method: ([a-zA-Z]+)"
-    )
+    res = dut_board.uart.extract_value(LOCATION_RE)
     assert res, "Failed to extract location data from UART output"
     print(res)
     lat, lon, acc, method = res
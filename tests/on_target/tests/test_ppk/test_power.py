@@ -4,6 +4,7 @@
 ##########################################################################################
 
 import os
+import re
 import time
 import json
 import types
@@ -34,6 +35,7 @@ SAMPLING_INTERVAL = 0.01
 CSV_FILE = "power_measurements.csv"
 HMTL_PLOT_FILE = "power_measurements_plot.html"
 SEGGER = os.getenv('SEGGER')
+UPTIME_RE = re.compile(r"Uptime: (.*) ms")
 
 
 def save_badge_data(average):
@@ -158,7 +160,7 @@ def thingy91x_ppk2():
         check_ppk_serial_operational(shell)
         time.sleep(1)
         shell.write("kernel uptime\r\n")
-        uptime = shell.wait_for_str_re("Uptime: (.*) ms", timeout=2)
+        uptime = shell.wait_for_str_re(UPTIME_RE, timeout=2)
         device_uptime_ms = int(uptime[0])
         if device_uptime_ms > 20000:
             pytest.fail("PPK device was not rebooted")
@@ -197,6 +199,7 @@ def thingy91x_ppk2():
             break
         except Exception as e:
             logger.warning(f"Exception: {e}")
+            get_uarts.cache_clear()
             ppk2_dev.toggle_DUT_power("OFF")
             time.sleep(2)
             ppk2_dev.toggle_DUT_power("ON")
@@ -221,7 +224,7 @@ def test_power(thingy91x_ppk2, hex_file):
 
     Current consumption is measured and report generated.
     '''
-    flash_device(os.path.abspath(hex_file), serial=SEGGER)
+    flash_device(hex_file, serial=SEGGER)
     reset_device(serial=SEGGER)
     try:
         thingy91x_ppk2.t91x_uart.wait_for_str("Connected to Cloud", timeout=120)
@@ -232,7 +235,7 @@ def test_power(thingy91x_ppk2, hex_file):
     thingy91x_ppk2.t91x_uart.write("pm suspend uart@9000\r\n")
     thingy91x_ppk2.t91x_uart.write("pm suspend uart@8000\r\n")
 
-    start = time.time()
+    start = time.monotonic()
     min_rolling_average = float('inf')
     rolling_average = float('inf')
     samples_list = []
@@ -241,7 +244,7 @@ def test_power(thingy91x_ppk2, hex_file):
 
     # Initialize an empty pandas Series to store samples over time
     samples_series = pd.Series(dtype='float64')
-    while time.time() < start + POWER_TIMEOUT:
+    while time.monotonic() < start + POWER_TIMEOUT:
         try:
             read_data = thingy91x_ppk2.ppk2_dev.get_data()
             if read_data != b'':
@@ -254,7 +257,7 @@ def test_power(thingy91x_ppk2, hex_file):
                 samples_series = pd.concat([samples_series, pd.Series([sample])], ignore_index=True)
 
                 # Log and store every 3 seconds
-                current_time = time.time()
+                current_time = time.monotonic()
                 if current_time - last_log_time >= 3:
                     # Calculate rolling average over the last 3 seconds
                     window_size = int(3 / SAMPLING_INTERVAL)
@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import re
 import time
 import pytest
 import requests.exceptions  # Used for handling HTTP errors from nRF Cloud API
@@ -16,13 +17,15 @@ logger = get_logger()
 # Default nRF Cloud CoAP security tag used for device credentials
 SEC_TAG = 16842753
 
+ATTESTATION_TOKEN_RE = re.compile(r'%ATTESTTOKEN: "([^"]+)"')
+
 # --- Helper Functions ---
 
 
 def _perform_initial_device_setup_and_factory_reset(dut_cloud, hex_file: str):
     logger.info(f"Flashing device with {hex_file} and performing factory reset.")
 
-    flash_device(os.path.abspath(hex_file))
+    flash_device(hex_file)
     dut_cloud.uart.xfactoryreset()
     dut_cloud.uart.flush()
     reset_device()
@@ -68,9 +71,7 @@ def _get_attestation_token_from_device(dut_cloud) -> str:
     logger.info("Getting attestation token from device...")
 
     dut_cloud.uart.at_cmd_write("at AT%ATTESTTOKEN\r\n")
-    token_match = dut_cloud.uart.wait_for_str_re(
-        r'%ATTESTTOKEN: "([^"]+)"', timeout=20
-    )
+    token_match = dut_cloud.uart.wait_for_str_re(ATTESTATION_TOKEN_RE, timeout=20)
 
     assert token_match, "No attestation token found"
     attestation_token = token_match[0]
@@ -152,8 +153,8 @@ def _verify_device_config_reported_to_cloud(dut_cloud, timeout: int = 180):
     """
     logger.info("Verifying device configuration is reported to cloud shadow...")
 
-    start = time.time()
-    while time.time() - start < timeout:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
         time.sleep(5)
         try:
             device = dut_cloud.cloud.get_device(dut_cloud.device_id)
@@ -10,6 +10,7 @@ import json
 import time
 import random
 import requests
+from requests.adapters import HTTPAdapter
 from enum import Enum
 from typing import Union, Callable
 from datetime import datetime, timedelta, timezone
@@ -21,6 +22,11 @@ logger = get_logger()
 DEFAULT_MAX_RETRIES = 3
 DEFAULT_RETRY_DELAY_SECONDS = 2
 RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+# Keep-alive connections kept open per host, enough for tests polling from a few threads
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 16
+# Device shadows fetched within this many seconds are shared by get_device_cached() callers
+DEVICE_CACHE_TTL_SECONDS = 1.0
 
 class FWType(Enum):
     app = 'application'
@@ -43,7 +49,12 @@ class NRFCloud():
         }
         self.session = requests.Session()
         self.session.headers.update(self.default_headers)
+        # Retries are handled by _request_with_retry, the adapter only sizes the connection pool
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
         self.timeout = timeout
+        # device_id -> (monotonic fetch time, device, ETag or None)
+        self._device_cache = {}
 
     def _request_with_retry(self, method: Callable, path: str, return_json: bool = False, **kwargs):
         """
@@ -154,6 +165,32 @@ class NRFCloud():
         """
         return self.get_devices(path=f"/{device_id}", params=params)
 
+    def get_device_cached(self, device_id: str, max_age: float = DEVICE_CACHE_TTL_SECONDS) -> dict:
+        """
+        Get device information like get_device(), reusing a response fetched less than
+        max_age seconds ago. Lets reads of several shadow fields share one request.
+        Older responses are revalidated with their ETag, if nrfcloud.com sent one, so an
+        unchanged device comes back as an empty 304 response.
+
+        :param device_id: Device ID
+        :param max_age: Maximum age in seconds of a cached response
+        :return: Json structure of result from nrfcloud.com
+        """
+        now = time.monotonic()
+        cached = self._device_cache.get(device_id)
+        if cached is not None and now - cached[0] < max_age:
+            return cached[1]
+        headers = {}
+        if cached is not None and cached[2]:
+            headers["If-None-Match"] = cached[2]
+        r = self._request_with_retry(self.session.get, f"/devices/{device_id}", headers=headers)
+        if r.status_code == 304:
+            device, etag = cached[1], cached[2]
+        else:
+            device, etag = r.json(), r.headers.get("ETag")
+        self._device_cache[device_id] = (now, device, etag)
+        return device
+
     def get_messages(self, device: str=None, appname: str="donald", max_records: int=50, max_age_hrs: int=24) -> list:
         """
         Get messages sent from asset_tracker to nrfcloud.com
@@ -0,0 +1,43 @@
+##########################################################################################
+# Copyright (c) 2025 Nordic Semiconductor
+# SPDX-License-Identifier: LicenseRef-Nordic-5-Clause
+##########################################################################################
+
+import json
+from unittest.mock import Mock, patch
+
+from nrfcloud import NRFCloud
+
+
+def mocked_cloud():
+    c = NRFCloud(api_key="key")
+    c.session = Mock()
+    c.session.patch.return_value.status_code = 200
+    return c
+
+def test_patch_config_single_request():
+    """Test that patch_config() sends all config values in one PATCH"""
+    c = mocked_cloud()
+    c.patch_config("device", sample_interval=60, storage_threshold=5)
+    assert c.session.patch.call_count == 1
+    kwargs = c.session.patch.call_args.kwargs
+    assert kwargs["url"].endswith("/devices/device/state")
+    assert json.loads(kwargs["data"]) == {
+        "desired": {"config": {"sample_interval": 60, "storage_threshold": 5}}
+    }
+
+@patch("time.monotonic", side_effect=[0, 10, 20])
+def test_get_device_cached_revalidates_etag(time_monotonic):
+    """Test that get_device_cached() revalidates an expired device with its ETag"""
+    c = mocked_cloud()
+    ok = Mock(status_code=200, headers={"ETag": '"v1"'})
+    ok.json.return_value = {"id": "device"}
+    not_modified = Mock(status_code=304, headers={})
+    c.session.get.side_effect = [ok, not_modified, ok]
+
+    device = c.get_device_cached("device")
+    assert c.session.get.call_args.kwargs["headers"] == {}
+    assert c.get_device_cached("device") is device
+    assert c.session.get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert c.get_device_cached("device") == device
+    assert c.session.get.call_count == 3
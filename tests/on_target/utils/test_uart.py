@@ -3,11 +3,12 @@
 # SPDX-License-Identifier: LicenseRef-Nordic-5-Clause
 ##########################################################################################
 
+import threading
 import time
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 import pytest
-from uart import Uart
+from uart import MsgSet, Uart, UartLogFailure, _as_msg_set
 
 
 def counter():
@@ -22,6 +23,7 @@ def mocked_uart(uart_init):
     u = Uart("uart")
     u._evt = Mock()
     u._evt.is_set.return_value = False
+    u._log_updated = MagicMock()
     return u
 
 @patch("time.time", side_effect=counter())
@@ -162,3 +164,136 @@ def test_wait_12_extract_missing_values(time_sleep, time_time):
     u.log = "foo: 123.45 baz: 23.45  bar: 0.1234"
     extrated_values = u.extract_value(r"foo: (\d.+) foo: (\d.+) foo: (\d.+)")
     assert extrated_values is None
+
+@patch("time.time", side_effect=counter())
+@patch("time.sleep")
+def test_wait_13_msg_set(time_sleep, time_time):
+    """Test that wait_for_str() works for MsgSet, including nested strings"""
+    u = mocked_uart()
+    u.log = "foo123\nbar123\nbaz123\n"
+    u.wait_for_str(MsgSet(["baz", "foo123", "foo", "bar"]), timeout=3)
+
+@patch("time.time", side_effect=counter())
+@patch("time.sleep")
+def test_wait_14_msg_set_missing(time_sleep, time_time):
+    """Test that wait_for_str() asserts when MsgSet string is missing"""
+    u = mocked_uart()
+    u.log = "foo123\nbar123\nbaz123\n"
+    with pytest.raises(AssertionError) as ex_info:
+        u.wait_for_str(MsgSet(["baz", "foo", "bar", "1234"]), timeout=3)
+    assert "1234" in str(ex_info.value)
+
+@patch("time.time", side_effect=counter())
+@patch("time.sleep")
+def test_wait_15_ordered_start_pos(time_sleep, time_time):
+    """Test that wait_for_str_ordered() only looks at the log after start_pos"""
+    u = mocked_uart()
+    u.log = "foo123\nbar123\nfoo123\nbaz123\n"
+    start_pos = u.log.index("bar") + 1
+    assert u.wait_for_str_ordered(["foo", "baz"], timeout=3, start_pos=start_pos) == len(u.log)
+    with pytest.raises(AssertionError) as ex_info:
+        u.wait_for_str_ordered(["bar", "baz"], timeout=3, start_pos=start_pos)
+    assert "bar missing" in str(ex_info.value)
+
+@patch("time.time", side_effect=counter())
+@patch("time.sleep")
+def test_wait_16_ordered_resume(time_sleep, time_time):
+    """Test that wait_for_str_ordered() finds messages split across log updates"""
+    u = mocked_uart()
+    u.log = "foo123\nba"
+    chunks = iter(["r123\nbaz", "123\n"])
+
+    def log_change(log):
+        u.log = log + next(chunks)
+
+    u._wait_for_log_change = log_change
+    assert u.wait_for_str_ordered(["foo", "bar", "baz123"], timeout=10) == len(u.log)
+
+@patch("time.time", side_effect=counter())
+@patch("time.sleep")
+def test_wait_17_failure(time_sleep, time_time):
+    """Test that wait_for_str() raises as soon as a failure message shows up"""
+    u = mocked_uart()
+    u.log = "foo123\nerror\nbaz123\n"
+    with pytest.raises(UartLogFailure) as ex_info:
+        u.wait_for_str(["foo", "bar"], timeout=100, failure_msgs=["error"])
+    assert "error" in str(ex_info.value)
+    assert time_sleep.call_count == 0
+
+@patch("time.time", side_effect=counter())
+@patch("time.sleep")
+def test_wait_re_failure(time_sleep, time_time):
+    """Test that wait_for_str_re() raises on a failure message, and ignores it before start_pos"""
+    u = mocked_uart()
+    u.log = "error\nfoo123\n"
+    assert u.wait_for_str_re(r"foo(\d+)", timeout=3, failure_msgs=["error"]) == ("123",)
+    with pytest.raises(UartLogFailure):
+        u.wait_for_str_re(r"bar", timeout=100, failure_msgs=["error"])
+    with pytest.raises(AssertionError):
+        u.wait_for_str_re(r"bar", timeout=3, start_pos=len("error"), failure_msgs=["error"])
+
+def test_wait_wakes_on_log_update():
+    """Test that wait_for_str() returns when a line is added rather than after a full interval"""
+    u = mocked_uart()
+    u.name = "uart"
+    u.log = u.whole_log = ""
+    u._log_updated = threading.Condition()
+    timer = threading.Timer(0.1, u._append_lines, args=("foo\n", ""))
+    start = time.monotonic()
+    timer.start()
+    u.wait_for_str("foo", timeout=3)
+    assert time.monotonic() - start < 0.5
+    timer.join()
+
+def test_msg_set_cached():
+    """Test that literal message lists map to one cached MsgSet"""
+    assert _as_msg_set(["foo", "bar"]) is _as_msg_set(("foo", "bar"))
+    assert _as_msg_set("foo").msgs == ("foo",)
+    msg_set = MsgSet(["foo"])
+    assert _as_msg_set(msg_set) is msg_set
+
+@patch("time.time", side_effect=counter())
+@patch("time.sleep")
+@patch("uart.ahocorasick", None)
+def test_wait_msg_set_overlapping_fallback(time_sleep, time_time):
+    """Test that the regex MsgSet finds messages that overlap without being nested"""
+    u = mocked_uart()
+    u.log = "abcd\nfoo123\n"
+    u.wait_for_str(MsgSet(["abc", "bcd", "foo123", "foo"]), timeout=3)
+    with pytest.raises(AssertionError) as ex_info:
+        u.wait_for_str(MsgSet(["abc", "bcd", "cde"]), timeout=3)
+    assert "cde" in str(ex_info.value)
+
+@patch("time.time", side_effect=counter())
+@patch("time.sleep")
+def test_wait_msg_set_flushed(time_sleep, time_time):
+    """Test that wait_for_str() forgets messages found in a log that was flushed since"""
+    u = mocked_uart()
+    u.log = "foo123\n"
+
+    def log_change(log):
+        u.log = "bar\n"
+
+    u._wait_for_log_change = log_change
+    with pytest.raises(AssertionError) as ex_info:
+        u.wait_for_str(["foo", "bar"], timeout=5)
+    assert "foo" in str(ex_info.value)
+
+def test_msg_set_single():
+    """Test that a single message MsgSet finds the message from pos on only"""
+    msg_set = MsgSet(["bar"])
+    assert list(msg_set.scan("foo bar", 0)) == ["bar"]
+    assert list(msg_set.scan("foo bar", 5)) == []
+    assert list(msg_set.scan("foo", 0)) == []
+
+def test_append_lines_split_chunks():
+    """Test that _append_lines() joins lines split across chunks and keeps the partial line"""
+    u = mocked_uart()
+    u.name = "uart"
+    u.log = u.whole_log = ""
+    line = u._append_lines("foo1", "")
+    assert line == "foo1" and u.log == ""
+    line = u._append_lines("23\r\nbar\r\nba", line)
+    assert line == "ba"
+    assert u.log == "\nfoo123\nbar"
+    assert u.whole_log == u.log
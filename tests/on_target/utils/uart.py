@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: LicenseRef-Nordic-5-Clause
 ##########################################################################################
 
+import functools
 import threading
 import serial
 import time
@@ -15,8 +16,16 @@ sys.path.append(os.getcwd())
 from utils.logger import get_logger
 from typing import Union
 
+try:
+    import ahocorasick
+except ImportError:
+    # Optional, MsgSet falls back to a regex alternation
+    ahocorasick = None
+
 DEFAULT_UART_TIMEOUT = 60 * 15
 DEFAULT_WAIT_FOR_STR_TIMEOUT = 60 * 10
+# Longest time a wait goes without rechecking its timeout, log updates wake it sooner
+_LOG_WAIT_INTERVAL = 1
 _READ_CHUNK_SIZE = 2048
 
 logger = get_logger()
@@ -24,6 +33,71 @@ logger = get_logger()
 class UartLogTimeout(Exception):
     pass
 
+class UartLogFailure(Exception):
+    """A failure message showed up in the log while waiting for other messages."""
+    pass
+
+
+def _can_overlap(x: str, y: str) -> bool:
+    # One contains the other, or the end of one is the start of the other
+    return x in y or y in x or any(
+        x.endswith(y[:k]) or y.endswith(x[:k]) for k in range(1, min(len(x), len(y))))
+
+
+class MsgSet:
+    """Literal messages that must all appear in the log, in any order.
+
+    The messages are matched with one Aho-Corasick automaton if pyahocorasick is installed,
+    else with one precompiled alternation, so the log is scanned once for all of them instead
+    of once per message. A single message is searched for with str.find(). Build it once,
+    e.g. at module level, and pass it to Uart.wait_for_str() in place of a list.
+    """
+    def __init__(self, msgs: list) -> None:
+        self.msgs = tuple(dict.fromkeys(msgs))
+        # Matches may straddle the end of the log scanned so far, rescan this much of it
+        self.overlap = max(map(len, self.msgs), default=1) - 1
+
+        self.automaton = None
+        if len(self.msgs) == 1:
+            # A single literal, e.g. from wait_for_str("..."), is found fastest with str.find()
+            self.hidden = frozenset()
+        elif ahocorasick is not None and self.msgs:
+            self.automaton = ahocorasick.Automaton()
+            for msg in self.msgs:
+                self.automaton.add_word(msg, msg)
+            self.automaton.make_automaton()
+            # The automaton reports every match, also overlapping ones
+            self.hidden = frozenset()
+        else:
+            # Longest first, so a message that is a prefix of another does not shadow it
+            self.regex = re.compile("|".join(map(re.escape, sorted(self.msgs, key=len, reverse=True))))
+            # finditer() reports non-overlapping matches only, so a message that can share
+            # characters with another one may be hidden by the other's match
+            self.hidden = frozenset(
+                x for x in self.msgs if any(x != y and _can_overlap(x, y) for y in self.msgs))
+
+    def scan(self, log: str, pos: int = 0):
+        """Yield the messages found in log from pos on."""
+        if len(self.msgs) == 1:
+            return iter(self.msgs if log.find(self.msgs[0], pos) != -1 else ())
+        if self.automaton is not None:
+            return (msg for _, msg in self.automaton.iter(log, pos))
+        return (m.group(0) for m in self.regex.finditer(log, pos))
+
+    def __repr__(self) -> str:
+        return repr(list(self.msgs))
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_msg_set(msgs: tuple) -> MsgSet:
+    # The same literal lists are waited for again and again, build their matcher once
+    return MsgSet(msgs)
+
+def _as_msg_set(msgs: Union[str, list, tuple, MsgSet]) -> MsgSet:
+    if isinstance(msgs, MsgSet):
+        return msgs
+    return _cached_msg_set(tuple(msgs) if isinstance(msgs, (list, tuple)) else (msgs,))
+
 
 class Uart:
     def __init__(
@@ -43,6 +117,8 @@ class Uart:
         self.whole_log = ""
         self._serial_exception_count = 0
         self._evt = threading.Event()
+        # Notified by the reader thread whenever it extends the log
+        self._log_updated = threading.Condition()
         self._writeq = queue.Queue()
         self._t = threading.Thread(target=self._uart)
         self._t.start()
@@ -94,17 +170,28 @@ class Uart:
         return b"".join(chunks)
 
     def _append_lines(self, data: str, line: str) -> str:
-        for ch in data:
-            line += ch
-            if ch != "\n":
-                continue
-            line = line.strip()
-            logger.debug(f"{self.name}: {line}")
-            self.log = self.log + "\n" + line
-            self.whole_log = self.whole_log + "\n" + line
-            line = ""
+        # Split the whole chunk at once and extend the logs once per chunk rather than once
+        # per line, each extension copies the log. Returns the unterminated last line.
+        *lines, line = (line + data).split("\n")
+        if not lines:
+            return line
+        lines = [entry.strip() for entry in lines]
+        for entry in lines:
+            logger.debug(f"{self.name}: {entry}")
+        text = "\n" + "\n".join(lines)
+        with self._log_updated:
+            self.log = self.log + text
+            self.whole_log = self.whole_log + text
+            self._log_updated.notify_all()
         return line
 
+    def _wait_for_log_change(self, log: str) -> None:
+        # Block until the log is no longer the given snapshot, i.e. lines were added or the log
+        # was flushed, instead of sleeping a fixed interval between scans
+        with self._log_updated:
+            self._log_updated.wait_for(
+                lambda: self.log is not log or self._evt.is_set(), _LOG_WAIT_INTERVAL)
+
     def _uart(self) -> None:
         s = serial.Serial(
             self.uart, baudrate=self.baudrate, timeout=self.serial_timeout
@@ -182,6 +269,8 @@ class Uart:
     def stop(self) -> None:
         self._selfdestruct.cancel()
         self._evt.set()
+        with self._log_updated:
+            self._log_updated.notify_all()
         self._t.join()
 
     def start(self, timeout: int = DEFAULT_UART_TIMEOUT) -> None:
@@ -198,59 +287,105 @@ class Uart:
         return len(self.log)
 
     def wait_for_str_ordered(
-        self, msgs: list, error_msg: str = "", timeout: int = DEFAULT_WAIT_FOR_STR_TIMEOUT
-    ) -> None:
+        self, msgs: list, error_msg: str = "", timeout: int = DEFAULT_WAIT_FOR_STR_TIMEOUT,
+        start_pos: int = 0
+    ) -> int:
+        """Wait for msgs to appear in the log after start_pos, in the given order.
+
+        Each poll resumes the search where the previous one stopped, instead of rescanning the
+        log from start_pos. Returns the log size once the last message is found.
+        """
         start_t = time.time()
+        index = 0
+        pos = start_pos
         while True:
-            missing = None
-            pos = 0
-            for msg in msgs:
-                try:
-                    pos = self.log.index(msg, pos)
-                except ValueError:
-                    missing = msg
+            log = self.log
+            if len(log) < pos:
+                # Log was flushed, start over
+                index = 0
+                pos = start_pos
+            while index < len(msgs):
+                found = log.find(msgs[index], pos)
+                if found == -1:
+                    # The next message may already have started arriving, keep its start in range
+                    pos = max(pos, len(log) - len(msgs[index]) + 1)
                     break
-                pos += 1
+                pos = found + 1
+                index += 1
             else:
-                break
+                return self.get_size()
             if start_t + timeout < time.time():
                 raise AssertionError(
-                    f"{missing if missing else msgs} missing in UART log in the expected order. {error_msg}"
+                    f"{msgs[index]} missing in UART log in the expected order. {error_msg}"
                 )
             if self._evt.is_set():
                 raise RuntimeError(f"Uart thread stopped, log:\n{self.log}")
-            time.sleep(1)
+            self._wait_for_log_change(log)
+
+    def wait_for_str(self, msgs: Union[str, list, MsgSet], error_msg: str = "", timeout: int = DEFAULT_WAIT_FOR_STR_TIMEOUT, start_pos: int = 0, failure_msgs: Union[list, MsgSet] = None) -> None:
+        """Wait for all msgs to appear in the log, in any order.
+
+        If any of failure_msgs appears first, raise UartLogFailure instead of waiting out the
+        timeout.
+        """
+        if failure_msgs is not None:
+            failure_msgs = _as_msg_set(failure_msgs)
+        return self._wait_for_msg_set(_as_msg_set(msgs), error_msg, timeout, start_pos, failure_msgs)
+
+    def _raise_on_failure(self, failure_msgs: MsgSet, log: str, pos: int, error_msg: str) -> None:
+        failure = next(failure_msgs.scan(log, pos), None)
+        if failure is not None:
+            raise UartLogFailure(f"{failure} found in UART log. {error_msg}\n")
 
-    def wait_for_str(self, msgs: Union[str, list], error_msg: str = "", timeout: int = DEFAULT_WAIT_FOR_STR_TIMEOUT, start_pos: int = 0) -> None:
+    def _wait_for_msg_set(self, msg_set: MsgSet, error_msg: str, timeout: int, start_pos: int, failure_msgs: MsgSet = None) -> int:
         start_t = time.time()
-        msgs = msgs if isinstance(msgs, (list, tuple)) else [msgs]
+        found = set()
+        scan_pos = start_pos
 
         while True:
-            missing_msgs = [x for x in msgs if x not in self.log[start_pos:]]
+            log = self.log
+            if len(log) < scan_pos:
+                # Log was flushed, start over
+                found.clear()
+                scan_pos = start_pos
+            # Only scan what was added since the previous poll, plus the overlap
+            found.update(msg_set.scan(log, max(start_pos, scan_pos - msg_set.overlap)))
+            if failure_msgs is not None:
+                self._raise_on_failure(
+                    failure_msgs, log, max(start_pos, scan_pos - failure_msgs.overlap), error_msg)
+            scan_pos = len(log)
+
+            missing_msgs = [x for x in msg_set.msgs
+                            if x not in found and (x not in msg_set.hidden or log.find(x, start_pos) == -1)]
             if missing_msgs == []:
                 return self.get_size()
             if start_t + timeout < time.time():
                 raise AssertionError(f"{missing_msgs} missing in UART log. {error_msg}\n")
             if self._evt.is_set():
                 raise RuntimeError(f"Uart thread stopped, log:\n{self.log}")
-            time.sleep(1)
+            self._wait_for_log_change(log)
 
-    def wait_for_str_re(self, pattern: str, error_msg: str = "", timeout: int = DEFAULT_WAIT_FOR_STR_TIMEOUT, start_pos: int = 0):
+    def wait_for_str_re(self, pattern: Union[str, re.Pattern], error_msg: str = "", timeout: int = DEFAULT_WAIT_FOR_STR_TIMEOUT, start_pos: int = 0, failure_msgs: Union[list, MsgSet] = None):
         start_t = time.time()
         regex = re.compile(pattern)
+        if failure_msgs is not None:
+            failure_msgs = _as_msg_set(failure_msgs)
 
         while True:
-            match = regex.search(self.log[start_pos:])
+            log = self.log
+            match = regex.search(log[start_pos:])
             if match:
                 # Return the first group if groups exist, else the whole match
                 return match.groups() if match.groups() else match.group(0)
+            if failure_msgs is not None:
+                self._raise_on_failure(failure_msgs, log, start_pos, error_msg)
             if start_t + timeout < time.time():
-                raise AssertionError(f"Pattern '{pattern}' not found in UART log. {error_msg}\n")
+                raise AssertionError(f"Pattern '{regex.pattern}' not found in UART log. {error_msg}\n")
             if self._evt.is_set():
                 raise RuntimeError(f"Uart thread stopped, log:\n{self.log}")
-            time.sleep(1)
+            self._wait_for_log_change(log)
 
-    def extract_value(self, pattern: str, start_pos: int = 0):
+    def extract_value(self, pattern: Union[str, re.Pattern], start_pos: int = 0):
         pattern = re.compile(pattern)
         match = pattern.search(self.log[start_pos:])
         if match:
@@ -286,7 +421,7 @@ class UartBinary(Uart):
         serial_timeout: int = 5,
         baudrate: int = 1000000,
     ) -> None:
-        self.data = b""
+        self.data = bytearray()
         super().__init__(
             uart=uart,
             timeout=timeout,
@@ -325,11 +460,12 @@ class UartBinary(Uart):
                 continue
             if not data:
                 continue
-            self.data = self.data + data
+            # Extended in place, concatenating bytes would copy the whole trace on every read
+            self.data += data
         s.close()
 
     def flush(self) -> None:
-        self.data = b""
+        self.data = bytearray()
 
     def save_to_file(self, filename: str) -> None:
         if len(self.data) == 0: